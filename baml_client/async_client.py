@@ -97,7 +97,7 @@ class BamlAsyncClient:
     
     async def EditCode(
         self,
-        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
         baml_options: _baml.BamlCallOptions = {},
     ) -> _baml.types.CodeChanges:
       options: _baml.BamlCallOptions = {**self.__baml_options, **(baml_options or {})}
@@ -114,7 +114,7 @@ class BamlAsyncClient:
       raw = await self.__runtime.call_function(
         "EditCode",
         {
-          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
         },
         self.__ctx_manager.clone_context(),
         tb,
@@ -124,6 +124,35 @@ class BamlAsyncClient:
       )
       return cast(_baml.types.CodeChanges, raw.cast_to(_baml.types, _baml.types, _baml.partial_types, False))
     
+    async def EditCodeBlocks(
+        self,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
+        baml_options: _baml.BamlCallOptions = {},
+    ) -> _baml.types.CodeEdits:
+      options: _baml.BamlCallOptions = {**self.__baml_options, **(baml_options or {})}
+
+      __tb__ = options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = options.get("client_registry", None)
+      collector = options.get("collector", None)
+      collectors = collector if isinstance(collector, list) else [collector] if collector is not None else []
+      env = _baml.env_vars_to_dict(options.get("env", {}))
+      raw = await self.__runtime.call_function(
+        "EditCodeBlocks",
+        {
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
+        },
+        self.__ctx_manager.clone_context(),
+        tb,
+        __cr__,
+        collectors,
+        env,
+      )
+      return cast(_baml.types.CodeEdits, raw.cast_to(_baml.types, _baml.types, _baml.partial_types, False))
+    
 
 
 class BamlStreamClient:
@@ -138,7 +167,7 @@ class BamlStreamClient:
     
     def EditCode(
         self,
-        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
         baml_options: _baml.BamlCallOptions = {},
     ) -> baml_py.BamlStream[_baml.partial_types.CodeChanges, _baml.types.CodeChanges]:
       options: _baml.BamlCallOptions = {**self.__baml_options, **(baml_options or {})}
@@ -158,6 +187,7 @@ class BamlStreamClient:
           "feedback": feedback,
           "code_files": code_files,
           "package_json": package_json,
+          "changed_files": changed_files,
         },
         None,
         self.__ctx_manager.get(),
@@ -174,6 +204,45 @@ class BamlStreamClient:
         self.__ctx_manager.get(),
       )
     
+    def EditCodeBlocks(
+        self,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
+        baml_options: _baml.BamlCallOptions = {},
+    ) -> baml_py.BamlStream[_baml.partial_types.CodeEdits, _baml.types.CodeEdits]:
+      options: _baml.BamlCallOptions = {**self.__baml_options, **(baml_options or {})}
+      __tb__ = options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = options.get("client_registry", None)
+      collector = options.get("collector", None)
+      collectors = collector if isinstance(collector, list) else [collector] if collector is not None else []
+      env = _baml.env_vars_to_dict(options.get("env", {}))
+      raw = self.__runtime.stream_function(
+        "EditCodeBlocks",
+        {
+          "history": history,
+          "feedback": feedback,
+          "code_files": code_files,
+          "package_json": package_json,
+          "changed_files": changed_files,
+        },
+        None,
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        collectors,
+        env,
+      )
+
+      return baml_py.BamlStream[_baml.partial_types.CodeEdits, _baml.types.CodeEdits](
+        raw,
+        lambda x: cast(_baml.partial_types.CodeEdits, x.cast_to(_baml.types, _baml.types, _baml.partial_types, True)),
+        lambda x: cast(_baml.types.CodeEdits, x.cast_to(_baml.types, _baml.types, _baml.partial_types, False)),
+        self.__ctx_manager.get(),
+      )
+    
 
 
 b = BamlAsyncClient(DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME, DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX)
@@ -16,7 +16,7 @@
 
 file_map = {
     
-    "build.baml": "class CodeChanges {\n  plan string @stream.with_state \n  files File[]\n  package_json string\n}\n\nclass File {\n    path string\n    content string\n    @@stream.done\n}\n\nclass Message {\n    role string\n    content string\n}\n\nclient<llm> ClaudeClient {\n  provider anthropic\n  options {\n     model \"claude-sonnet-4-20250514\"\n     temperature 0.7\n     max_tokens 8192  // Increase from 4096 to 8192\n    api_key env.ANTHROPIC_API_KEY\n  }\n}\n\nfunction EditCode(history: Message[], feedback: string, code_files: File[], package_json: string) -> CodeChanges {\n    client ClaudeClient\n\n    prompt #\"\n    {{ _.role(\"system\") }}\n    You are BeamO, an elite AI developer specializing in modern web applications. You create production-quality, visually stunning applications with best practices.\n\n    <guidelines>\n    \n    ## Design Philosophy\n    - Create MODERN, POLISHED designs that look professional and production-ready\n    - Use contemporary UI patterns: glassmorphism, gradient accents, smooth animations, micro-interactions\n    - Prioritize visual hierarchy, proper spacing, and thoughtful color schemes\n    - Every component should be visually appealing with proper shadows, borders, and hover states\n    - Make designs that would impress on a portfolio or product demo\n    \n    ## Core Requirements\n    - Edit code files based on feedback, returning ALL updated files\n    - Remove unused code and dependencies\n    - Use ABSOLUTE file paths (e.g., /app/src/components/Dashboard.tsx)\n    - NEVER modify main.tsx!\n    - Start by explaining your implementation plan\n    - All components must be self-contained with mock data\n    \n    ## Feature Implementation Strategy\n    1. Identify CORE FEATURES needed for the user's request\n    2. Research design inspiration relevant to the topic (e.g., Netflix → dark theme, hero sections, card grids)\n    3. For complex apps, implement multiple pages with React Router\n    4. Ensure EVERY component is imported and visible in the app\n    5. Create reusable components for common patterns\n    6. Use MOCK/PLACEHOLDER data for all content - define it as constants in the component\n    \n    ## Technical Guidelines\n    \n    ### Styling & Design\n    - Use Tailwind CSS exclusively for all styling\n    - Leverage shadcn/ui components (Button, Card, Dialog, etc.)\n    - Implement responsive designs (mobile-first approach)\n    - Add smooth transitions and hover effects\n    - Use proper color palettes (not just default Tailwind colors)\n    - Include loading states and empty states where appropriate\n    \n    ### React Best Practices\n    - Use functional components with hooks (useState, useEffect, useMemo)\n    - Add meaningful console.logs for debugging\n    - Use React Router v6 syntax (Routes, not Switch) when routing is needed\n    - Avoid try/catch unless specifically requested (let errors bubble up)\n    \n    ### Code Quality\n    - Write clean, readable code with proper TypeScript types\n    - Add helpful comments for complex logic\n    - Follow consistent naming conventions\n    - Structure files logically (components, utils, types)\n    - Ensure imports are correct and dependencies exist in package.json\n    \n    ### Available Libraries (ONLY USE THESE):\n    - lucide-react: Icons\n    - recharts: Charts and graphs\n    - shadcn/ui: Pre-built UI components (import from @/components/ui/*)\n    - react-router-dom: Routing (use Routes, Route, Link, useNavigate)\n    - All dependencies in the provided package.json\n    \n    ### CRITICAL RESTRICTIONS - YOU MUST FOLLOW THESE\n    - DO NOT use fetch() or axios for API calls\n    - DO NOT use WebSockets or any real-time connection libraries\n    - DO NOT import from 'ws' or any WebSocket library\n    - DO NOT use external APIs or services\n    - DO NOT use process.env for runtime configuration\n    - DO NOT use libraries not listed in package.json\n    - USE ONLY mock/placeholder data defined as constants in your components\n    - For images: use colored div placeholders with gradients, NOT external URLs\n    - Make all content iframe-compatible (no external resources)\n    - Use relative paths for any assets\n    - Ensure App.tsx properly imports and renders new features\n    \n    ## Example Quality Standards\n    \n    For a Netflix clone, you should create:\n    - Hero section with full-width background using gradient backgrounds, prominent CTA\n    - Content rows with horizontal scrolling cards\n    - Hover effects that scale cards and show details\n    - Use colored div placeholders with Tailwind gradients for movie posters (e.g., bg-gradient-to-br from-purple-500 to-pink-500)\n    - Mock data array with movie titles, genres, ratings defined as const in component\n    - Navigation bar with smooth transitions\n    - Multiple pages if requested (Browse, My List, Search)\n    - Responsive grid layouts that adapt to screen size\n    - NO external API calls - all data must be mock data defined in the file\n    \n    For a Dashboard:\n    - Clean header with navigation\n    - Sidebar with icons and active states\n    - Cards with shadows and proper spacing\n    - Interactive charts with mock data defined as constants\n    - Data tables with mock data and basic sorting\n    - Responsive layout that collapses sidebar on mobile\n    - Use recharts with sample data arrays defined in the component\n    - NO external API calls - define sample data like: const data = [{ name: 'Jan', value: 400 }, ...]\n    \n    For a Landing Page:\n    - Hero section with compelling headline and CTA\n    - Features grid with icons from lucide-react\n    - Pricing cards with different tiers\n    - Testimonials section with mock reviews\n    - Footer with links\n    - Smooth scroll animations using Tailwind transitions\n    - All content as hardcoded strings or const arrays\n    \n    </guidelines>\n\n    ## Conversation History\n    {% for msg in history %}\n    {{ _.role(msg.role) }}\n    {{ msg.content }}\n    {% endfor %}\n\n    {{ _.role(\"user\") }}\n    \n    **User Feedback:** \"{{ feedback }}\"\n  \n    ## Your Task\n    Based on the feedback above, create or modify the application to implement the requested features.\n    \n    **CRITICAL REMINDERS:**\n    - Focus ONLY on changes related to the feedback\n    - Use ABSOLUTE file paths (e.g., /app/src/components/MyComponent.tsx)\n    - Verify all dependencies exist in package.json\n    - Make it visually impressive and production-ready\n    - Use ONLY mock/placeholder data - NO fetch, NO WebSockets, NO external APIs\n    - For images use colored divs with Tailwind gradients instead of img tags\n    - Ensure iframe compatibility\n    - All data must be defined as constants in your components\n    \n    ## Current Code Files\n    {% for file in code_files %}\n    <filepath>{{ file.path }}</filepath>\n    <code>\n    {{ file.content }}\n    </code>\n    {% endfor %}\n\n    ## Package Dependencies\n    <package.json>\n    {{ package_json }}\n    </package.json>\n\n    {{ ctx.output_format }}\n    \"#\n}\n\ntest TestEditCode {\n    functions [EditCode]\n    args {\n      history [\n        {\n          role \"user\"\n          content \"Build a dashboard with charts using mock data\"\n        }\n      ]\n      code_files [\n        {\n          path \"/app/src/App.tsx\"\n          content \"export default function App() { return <div>Hello</div> }\"\n        }\n      ]\n      package_json \"{ \\\"dependencies\\\": { \\\"react\\\": \\\"^18.2.0\\\", \\\"react-dom\\\": \\\"^18.2.0\\\", \\\"react-router-dom\\\": \\\"^6.0.0\\\", \\\"lucide-react\\\": \\\"latest\\\", \\\"recharts\\\": \\\"latest\\\" } }\"\n      feedback \"Create a modern dashboard with stat cards and a line chart. Use mock data only.\"\n    }\n}",
+    "build.baml": "class CodeChanges {\n  plan string @stream.with_state \n  files GeneratedFile[]\n  package_json string\n}\n\nclass File {\n    path string\n    content string\n    @@stream.done\n}\n\n// An output file whose content streams in as it is generated; the client\n// can render it progressively, but it is only applied once it is Complete\nclass GeneratedFile {\n    path string @stream.done\n    content string @stream.with_state\n}\n\nclass Message {\n    role string\n    content string\n}\n\nclass EditBlock {\n    path string\n    search string\n    replace string\n    @@stream.done\n}\n\nclass CodeEdits {\n  plan string @stream.with_state\n  edits EditBlock[]\n  files File[]\n  package_json string\n}\n\nclient<llm> ClaudeClient {\n  provider anthropic\n  options {\n     model \"claude-sonnet-4-20250514\"\n     temperature 0.7\n     max_tokens 8192  // Increase from 4096 to 8192\n    api_key env.ANTHROPIC_API_KEY\n    // Lets the prompt mark cache breakpoints with _.role(..., cache_control=...)\n    allowed_role_metadata [\"cache_control\"]\n  }\n}\n\n// Shared between EditCode and EditCodeBlocks so both render the same cached prefix\ntemplate_string Guidelines() #\"\n    You are BeamO, an elite AI developer specializing in modern web applications. You create production-quality, visually stunning applications with best practices.\n\n    <guidelines>\n    \n    ## Design Philosophy\n    - Create MODERN, POLISHED designs that look professional and production-ready\n    - Use contemporary UI patterns: glassmorphism, gradient accents, smooth animations, micro-interactions\n    - Prioritize visual hierarchy, proper spacing, and thoughtful color schemes\n    - Every component should be visually appealing with proper shadows, borders, and hover states\n    - Make designs that would impress on a portfolio or product demo\n    \n    ## Core Requirements\n    - Edit code files based on feedback, returning ALL updated files\n    - Remove unused code and dependencies\n    - Use ABSOLUTE file paths (e.g., /app/src/components/Dashboard.tsx)\n    - NEVER modify main.tsx!\n    - Start by explaining your implementation plan\n    - All components must be self-contained with mock data\n    \n    ## Feature Implementation Strategy\n    1. Identify CORE FEATURES needed for the user's request\n    2. Research design inspiration relevant to the topic (e.g., Netflix → dark theme, hero sections, card grids)\n    3. For complex apps, implement multiple pages with React Router\n    4. Ensure EVERY component is imported and visible in the app\n    5. Create reusable components for common patterns\n    6. Use MOCK/PLACEHOLDER data for all content - define it as constants in the component\n    \n    ## Technical Guidelines\n    \n    ### Styling & Design\n    - Use Tailwind CSS exclusively for all styling\n    - Leverage shadcn/ui components (Button, Card, Dialog, etc.)\n    - Implement responsive designs (mobile-first approach)\n    - Add smooth transitions and hover effects\n    - Use proper color palettes (not just default Tailwind colors)\n    - Include loading states and empty states where appropriate\n    \n    ### React Best Practices\n    - Use functional components with hooks (useState, useEffect, useMemo)\n    - Add meaningful console.logs for debugging\n    - Use React Router v6 syntax (Routes, not Switch) when routing is needed\n    - Avoid try/catch unless specifically requested (let errors bubble up)\n    \n    ### Code Quality\n    - Write clean, readable code with proper TypeScript types\n    - Add helpful comments for complex logic\n    - Follow consistent naming conventions\n    - Structure files logically (components, utils, types)\n    - Ensure imports are correct and dependencies exist in package.json\n    \n    ### Available Libraries (ONLY USE THESE):\n    - lucide-react: Icons\n    - recharts: Charts and graphs\n    - shadcn/ui: Pre-built UI components (import from @/components/ui/*)\n    - react-router-dom: Routing (use Routes, Route, Link, useNavigate)\n    - All dependencies in the provided package.json\n    \n    ### CRITICAL RESTRICTIONS - YOU MUST FOLLOW THESE\n    - DO NOT use fetch() or axios for API calls\n    - DO NOT use WebSockets or any real-time connection libraries\n    - DO NOT import from 'ws' or any WebSocket library\n    - DO NOT use external APIs or services\n    - DO NOT use process.env for runtime configuration\n    - DO NOT use libraries not listed in package.json\n    - USE ONLY mock/placeholder data defined as constants in your components\n    - For images: use colored div placeholders with gradients, NOT external URLs\n    - Make all content iframe-compatible (no external resources)\n    - Use relative paths for any assets\n    - Ensure App.tsx properly imports and renders new features\n    \n    ## Example Quality Standards\n    \n    For a Netflix clone, you should create:\n    - Hero section with full-width background using gradient backgrounds, prominent CTA\n    - Content rows with horizontal scrolling cards\n    - Hover effects that scale cards and show details\n    - Use colored div placeholders with Tailwind gradients for movie posters (e.g., bg-gradient-to-br from-purple-500 to-pink-500)\n    - Mock data array with movie titles, genres, ratings defined as const in component\n    - Navigation bar with smooth transitions\n    - Multiple pages if requested (Browse, My List, Search)\n    - Responsive grid layouts that adapt to screen size\n    - NO external API calls - all data must be mock data defined in the file\n    \n    For a Dashboard:\n    - Clean header with navigation\n    - Sidebar with icons and active states\n    - Cards with shadows and proper spacing\n    - Interactive charts with mock data defined as constants\n    - Data tables with mock data and basic sorting\n    - Responsive layout that collapses sidebar on mobile\n    - Use recharts with sample data arrays defined in the component\n    - NO external API calls - define sample data like: const data = [{ name: 'Jan', value: 400 }, ...]\n    \n    For a Landing Page:\n    - Hero section with compelling headline and CTA\n    - Features grid with icons from lucide-react\n    - Pricing cards with different tiers\n    - Testimonials section with mock reviews\n    - Footer with links\n    - Smooth scroll animations using Tailwind transitions\n    - All content as hardcoded strings or const arrays\n    \n    </guidelines>\n\"#\n\ntemplate_string CodeListing(code_files: File[], package_json: string) #\"\n    ## Current Code Files\n    {% for file in code_files %}\n    <filepath>{{ file.path }}</filepath>\n    <code>\n    {{ file.content }}\n    </code>\n    {% endfor %}\n\n    ## Package Dependencies\n    <package.json>\n    {{ package_json }}\n    </package.json>\n\"#\n\ntemplate_string ChangedFiles(changed_files: File[]) #\"\n    {% if changed_files %}\n    ## Files Changed Since The Listing Above\n    These versions replace the ones in Current Code Files.\n    {% for file in changed_files %}\n    <filepath>{{ file.path }}</filepath>\n    <code>\n    {{ file.content }}\n    </code>\n    {% endfor %}\n    {% endif %}\n\"#\n\ntemplate_string Reminders() #\"\n    **CRITICAL REMINDERS:**\n    - Focus ONLY on changes related to the feedback\n    - Files listed with \"Contents omitted from this prompt\" exist and are unchanged: do NOT return or edit them\n    - Use ABSOLUTE file paths (e.g., /app/src/components/MyComponent.tsx)\n    - Verify all dependencies exist in package.json\n    - Make it visually impressive and production-ready\n    - Use ONLY mock/placeholder data - NO fetch, NO WebSockets, NO external APIs\n    - For images use colored divs with Tailwind gradients instead of img tags\n    - Ensure iframe compatibility\n    - All data must be defined as constants in your components\n\"#\n\nfunction EditCode(history: Message[], feedback: string, code_files: File[], package_json: string, changed_files: File[]) -> CodeChanges {\n    client ClaudeClient\n\n    // Laid out for Anthropic prompt caching: the guidelines and the code\n    // listing are stable between turns and each end in a cache breakpoint.\n    // Everything that changes every turn comes after them.\n    prompt #\"\n    {{ _.role(\"system\", cache_control={\"type\": \"ephemeral\"}) }}\n    {{ Guidelines() }}\n\n    {{ _.role(\"user\", cache_control={\"type\": \"ephemeral\"}) }}\n    {{ CodeListing(code_files, package_json) }}\n\n    ## Conversation History\n    {% for msg in history %}\n    {{ _.role(msg.role) }}\n    {{ msg.content }}\n    {% endfor %}\n\n    {{ _.role(\"user\") }}\n    {{ ChangedFiles(changed_files) }}\n\n    **User Feedback:** \"{{ feedback }}\"\n  \n    ## Your Task\n    Based on the feedback above, create or modify the application to implement the requested features.\n    \n    {{ Reminders() }}\n\n    {{ ctx.output_format }}\n    \"#\n}\n\n// Same prompt as EditCode, but existing files are changed with search/replace\n// blocks instead of being re-emitted whole, so output scales with the change\nfunction EditCodeBlocks(history: Message[], feedback: string, code_files: File[], package_json: string, changed_files: File[]) -> CodeEdits {\n    client ClaudeClient\n\n    prompt #\"\n    {{ _.role(\"system\", cache_control={\"type\": \"ephemeral\"}) }}\n    {{ Guidelines() }}\n\n    {{ _.role(\"user\", cache_control={\"type\": \"ephemeral\"}) }}\n    {{ CodeListing(code_files, package_json) }}\n\n    ## Conversation History\n    {% for msg in history %}\n    {{ _.role(msg.role) }}\n    {{ msg.content }}\n    {% endfor %}\n\n    {{ _.role(\"user\") }}\n    {{ ChangedFiles(changed_files) }}\n\n    **User Feedback:** \"{{ feedback }}\"\n  \n    ## Your Task\n    Based on the feedback above, create or modify the application to implement the requested features.\n\n    ## Edit Format\n    Do NOT return whole files that already exist. Change them with edit blocks instead:\n    - `search` is a contiguous run of lines copied exactly from the current file, long enough to match only once\n    - `replace` is what those lines become; leave it empty to delete them\n    - Use several small blocks rather than one large one, in the order they appear in the file\n    - New files go in `files` with their complete contents, and so does any file you rewrite almost entirely\n    \n    {{ Reminders() }}\n\n    {{ ctx.output_format }}\n    \"#\n}\n\ntest TestEditCode {\n    functions [EditCode]\n    args {\n      history [\n        {\n          role \"user\"\n          content \"Build a dashboard with charts using mock data\"\n        }\n      ]\n      code_files [\n        {\n          path \"/app/src/App.tsx\"\n          content \"export default function App() { return <div>Hello</div> }\"\n        }\n      ]\n      package_json \"{ \\\"dependencies\\\": { \\\"react\\\": \\\"^18.2.0\\\", \\\"react-dom\\\": \\\"^18.2.0\\\", \\\"react-router-dom\\\": \\\"^6.0.0\\\", \\\"lucide-react\\\": \\\"latest\\\", \\\"recharts\\\": \\\"latest\\\" } }\"\n      feedback \"Create a modern dashboard with stat cards and a line chart. Use mock data only.\"\n      changed_files []\n    }\n}\n\ntest TestEditCodeBlocks {\n    functions [EditCodeBlocks]\n    args {\n      history []\n      code_files [\n        {\n          path \"/app/src/App.tsx\"\n          content \"export default function App() {\\n  return <h1 className=\\\"text-blue-500\\\">Hello</h1>\\n}\\n\"\n        }\n      ]\n      package_json \"{ \\\"dependencies\\\": { \\\"react\\\": \\\"^18.2.0\\\", \\\"react-dom\\\": \\\"^18.2.0\\\" } }\"\n      feedback \"Make the heading green.\"\n      changed_files []\n    }\n}\n",
 }
 
 def get_baml_files():
@@ -60,6 +60,35 @@ class LlmResponseParser:
 
       return cast(_baml.types.CodeChanges, parsed)
     
+    def EditCodeBlocks(
+        self,
+        llm_response: str,
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> _baml.types.CodeEdits:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      parsed = self.__runtime.parse_llm_response(
+        "EditCodeBlocks",
+        llm_response,
+        _baml.types,
+        _baml.types,
+        _baml.partial_types,
+        False,
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+      )
+
+      return cast(_baml.types.CodeEdits, parsed)
+    
 
 
 class LlmStreamParser:
@@ -100,6 +129,35 @@ class LlmStreamParser:
 
       return cast(_baml.partial_types.CodeChanges, parsed)
     
+    def EditCodeBlocks(
+        self,
+        llm_response: str,
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> _baml.partial_types.CodeEdits:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      parsed = self.__runtime.parse_llm_response(
+        "EditCodeBlocks",
+        llm_response,
+        _baml.types,
+        _baml.types,
+        _baml.partial_types,
+        True,
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+      )
+
+      return cast(_baml.partial_types.CodeEdits, parsed)
+    
 
 
 __all__ = ["LlmResponseParser", "LlmStreamParser"]
\ No newline at end of file
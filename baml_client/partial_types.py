@@ -39,13 +39,28 @@ class StreamState(BaseModel, Generic[T]):
 
 class CodeChanges(BaseModel):
     plan: StreamState[Optional[str]]
+    files: List["GeneratedFile"]
+    package_json: Optional[str] = None
+
+class CodeEdits(BaseModel):
+    plan: StreamState[Optional[str]]
+    edits: List["types.EditBlock"]
     files: List["types.File"]
     package_json: Optional[str] = None
 
+class EditBlock(BaseModel):
+    path: Optional[str] = None
+    search: Optional[str] = None
+    replace: Optional[str] = None
+
 class File(BaseModel):
     path: Optional[str] = None
     content: Optional[str] = None
 
+class GeneratedFile(BaseModel):
+    path: Optional[str] = None
+    content: StreamState[Optional[str]]
+
 class Message(BaseModel):
     role: Optional[str] = None
     content: Optional[str] = None
@@ -32,7 +32,7 @@ class HttpRequest:
     
     def EditCode(
         self,
-        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
         baml_options: _baml.BamlCallOptionsModApi = {},
     ) -> baml_py.HTTPRequest:
       __tb__ = baml_options.get("tb", None)
@@ -46,7 +46,32 @@ class HttpRequest:
       return self.__runtime.build_request_sync(
         "EditCode",
         {
-          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        False,
+      )
+    
+    def EditCodeBlocks(
+        self,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return self.__runtime.build_request_sync(
+        "EditCodeBlocks",
+        {
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
         },
         self.__ctx_manager.get(),
         tb,
@@ -68,7 +93,7 @@ class HttpStreamRequest:
     
     def EditCode(
         self,
-        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
         baml_options: _baml.BamlCallOptionsModApi = {},
     ) -> baml_py.HTTPRequest:
       __tb__ = baml_options.get("tb", None)
@@ -82,7 +107,32 @@ class HttpStreamRequest:
       return self.__runtime.build_request_sync(
         "EditCode",
         {
-          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        True,
+      )
+    
+    def EditCodeBlocks(
+        self,
+        history: List[_baml.types.Message],feedback: str,code_files: List[_baml.types.File],package_json: str,changed_files: List[_baml.types.File],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return self.__runtime.build_request_sync(
+        "EditCodeBlocks",
+        {
+          "history": history,"feedback": feedback,"code_files": code_files,"package_json": package_json,"changed_files": changed_files,
         },
         self.__ctx_manager.get(),
         tb,
@@ -22,7 +22,7 @@ from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIM
 class TypeBuilder(_TypeBuilder):
     def __init__(self):
         super().__init__(classes=set(
-          ["CodeChanges","File","Message",]
+          ["CodeChanges","CodeEdits","EditBlock","File","GeneratedFile","Message",]
         ), enums=set(
           []
         ), runtime=DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME)
@@ -32,10 +32,22 @@ class TypeBuilder(_TypeBuilder):
     def CodeChanges(self) -> "CodeChangesAst":
         return CodeChangesAst(self)
 
+    @property
+    def CodeEdits(self) -> "CodeEditsAst":
+        return CodeEditsAst(self)
+
+    @property
+    def EditBlock(self) -> "EditBlockAst":
+        return EditBlockAst(self)
+
     @property
     def File(self) -> "FileAst":
         return FileAst(self)
 
+    @property
+    def GeneratedFile(self) -> "GeneratedFileAst":
+        return GeneratedFileAst(self)
+
     @property
     def Message(self) -> "MessageAst":
         return MessageAst(self)
@@ -90,6 +102,102 @@ class CodeChangesProperties:
 
     
 
+class CodeEditsAst:
+    def __init__(self, tb: _TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("CodeEdits")
+        self._properties: typing.Set[str] = set([ "plan",  "edits",  "files",  "package_json", ])
+        self._props = CodeEditsProperties(self._bldr, self._properties)
+
+    def type(self) -> FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "CodeEditsProperties":
+        return self._props
+
+
+class CodeEditsViewer(CodeEditsAst):
+    def __init__(self, tb: _TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, ClassPropertyViewer]]:
+        return [(name, ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+
+
+
+class CodeEditsProperties:
+    def __init__(self, bldr: ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties
+
+    
+
+    @property
+    def plan(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("plan"))
+
+    @property
+    def edits(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("edits"))
+
+    @property
+    def files(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("files"))
+
+    @property
+    def package_json(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("package_json"))
+
+    
+
+class EditBlockAst:
+    def __init__(self, tb: _TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("EditBlock")
+        self._properties: typing.Set[str] = set([ "path",  "search",  "replace", ])
+        self._props = EditBlockProperties(self._bldr, self._properties)
+
+    def type(self) -> FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "EditBlockProperties":
+        return self._props
+
+
+class EditBlockViewer(EditBlockAst):
+    def __init__(self, tb: _TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, ClassPropertyViewer]]:
+        return [(name, ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+
+
+
+class EditBlockProperties:
+    def __init__(self, bldr: ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties
+
+    
+
+    @property
+    def path(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("path"))
+
+    @property
+    def search(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("search"))
+
+    @property
+    def replace(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("replace"))
+
+    
+
 class FileAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
@@ -132,6 +240,48 @@ class FileProperties:
 
     
 
+class GeneratedFileAst:
+    def __init__(self, tb: _TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("GeneratedFile")
+        self._properties: typing.Set[str] = set([ "path",  "content", ])
+        self._props = GeneratedFileProperties(self._bldr, self._properties)
+
+    def type(self) -> FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "GeneratedFileProperties":
+        return self._props
+
+
+class GeneratedFileViewer(GeneratedFileAst):
+    def __init__(self, tb: _TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, ClassPropertyViewer]]:
+        return [(name, ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+
+
+
+class GeneratedFileProperties:
+    def __init__(self, bldr: ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties
+
+    
+
+    @property
+    def path(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("path"))
+
+    @property
+    def content(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("content"))
+
+    
+
 class MessageAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
@@ -43,13 +43,28 @@ def all_succeeded(checks: Dict[CheckName, Check]) -> bool:
 
 class CodeChanges(BaseModel):
     plan: str
+    files: List["GeneratedFile"]
+    package_json: str
+
+class CodeEdits(BaseModel):
+    plan: str
+    edits: List["EditBlock"]
     files: List["File"]
     package_json: str
 
+class EditBlock(BaseModel):
+    path: str
+    search: str
+    replace: str
+
 class File(BaseModel):
     path: str
     content: str
 
+class GeneratedFile(BaseModel):
+    path: str
+    content: str
+
 class Message(BaseModel):
     role: str
     content: str
@@ -0,0 +1,89 @@
+"""
+Load test for Agent.send_feedback: run many sessions at once against a fake
+model client and measure how many generations actually overlap on one event
+loop. --blocking reproduces the old sync-client behaviour.
+
+    python -m benchmarks.bench_concurrent_generation --sessions 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.agent import Agent
+
+from .fake_llm import FakeModelClient
+from .fixtures import make_agent, make_project
+
+
+async def _run_session(agent: Agent, session_id: str) -> dict:
+    start = time.perf_counter()
+    first = None
+    # Every session starts from the same project, so identical feedback would
+    # be answered by the response cache after the first generation
+    feedback = f"Add a chart to {session_id}"
+    async for message in agent.send_feedback(session_id=session_id, feedback=feedback):
+        if first is None and message["type"] == "agent_partial":
+            first = time.perf_counter() - start
+    return {"first_partial": first, "total": time.perf_counter() - start}
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Largest delay seen by a 10ms ticker, i.e. how long the loop was blocked."""
+    worst = 0.0
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - before - 0.01)
+    return worst
+
+
+async def _bench(sessions: int, blocking: bool, delay: float, ttft: float) -> dict:
+    model_client = FakeModelClient(delay=delay, ttft=ttft, blocking=blocking)
+    session_ids = [f"session-{i}" for i in range(sessions)]
+    with make_agent(make_project(20), model_client, session_ids=session_ids) as agent:
+        stop = asyncio.Event()
+        lag = asyncio.create_task(_loop_lag(stop))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(_run_session(agent, s) for s in session_ids))
+        wall = time.perf_counter() - start
+        stop.set()
+
+    single = ttft + delay * (len(model_client.partials) - 1)
+    return {
+        "mode": "blocking" if blocking else "async",
+        "sessions": sessions,
+        "wall_seconds": wall,
+        "concurrent_generations": sessions * single / wall,
+        "first_partial_p50": statistics.median(r["first_partial"] for r in results),
+        "max_loop_lag": await lag,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.01, help="seconds between partials")
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--blocking-sessions", type=int, default=5,
+                        help="sessions for the blocking run, which is serialised")
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(_bench(args.blocking_sessions, True, args.delay, args.ttft)),
+        asyncio.run(_bench(args.sessions, False, args.delay, args.ttft)),
+    ]
+
+    print()
+    for r in results:
+        print(
+            f"{r['mode']:>8}: {r['sessions']:4d} sessions in {r['wall_seconds']:6.2f}s  "
+            f"~{r['concurrent_generations']:6.1f} concurrent generations  "
+            f"first partial p50 {r['first_partial_p50'] * 1000:7.0f}ms  "
+            f"max loop lag {r['max_loop_lag'] * 1000:6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Output tokens and time to apply a one-line change, with the model re-emitting
+whole files (EditCode) versus search/replace blocks (EditCodeBlocks).
+
+    python -m benchmarks.bench_edit_format --file-lines 200 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.context import estimate_tokens
+
+from .fake_llm import FakeModelClient, make_edit_partials, make_partials
+from .fake_sandbox import FakeSandbox
+from .fixtures import make_agent, make_project
+
+TARGET = "/app/src/pages/Dashboard.tsx"
+PLAN = "I'll switch the dashboard heading from blue to emerald."
+
+
+def make_dashboard(lines: int) -> str:
+    rows = "\n".join(
+        f'        <StatCard key="stat-{i}" label="Metric {i}" value={{data[{i % 12}].value}} />'
+        for i in range(lines)
+    )
+    return (
+        'import { StatCard } from "@/components/StatCard";\n\n'
+        "export default function Dashboard({ data }) {\n"
+        "  return (\n"
+        '    <div className="p-6">\n'
+        '      <h1 className="text-3xl font-bold text-blue-600">Dashboard</h1>\n'
+        '      <div className="grid grid-cols-4 gap-4">\n'
+        f"{rows}\n"
+        "      </div>\n"
+        "    </div>\n"
+        "  );\n"
+        "}\n"
+    )
+
+
+async def _bench(edit_format: str, file_lines: int, latency: float, delay: float) -> dict:
+    files = make_project(20)
+    original = make_dashboard(file_lines)
+    files[TARGET] = original.encode()
+    sandbox = FakeSandbox(files, latency=latency)
+
+    search = '      <h1 className="text-3xl font-bold text-blue-600">Dashboard</h1>\n'
+    replace = '      <h1 className="text-3xl font-bold text-emerald-600">Dashboard</h1>\n'
+    expected = original.replace(search, replace)
+
+    if edit_format == "blocks":
+        partials = make_edit_partials(PLAN, [(TARGET, search, replace)])
+        output = {"plan": PLAN, "edits": [{"path": TARGET, "search": search, "replace": replace}]}
+    else:
+        partials = make_partials(PLAN, {TARGET: expected})
+        output = {"plan": PLAN, "files": [{"path": TARGET, "content": expected}]}
+
+    model_client = FakeModelClient(
+        partials=make_partials(PLAN, {TARGET: expected}),
+        edit_partials=partials,
+        delay=delay,
+        ttft=0.2,
+    )
+    with make_agent(files, model_client, sandbox=sandbox) as agent:
+        agent.edit_format = edit_format
+
+        start = time.perf_counter()
+        async for message in agent.send_feedback(
+            session_id="session", feedback="Make the heading green"
+        ):
+            if message["type"] == "update_completed":
+                completed = time.perf_counter() - start
+
+    assert sandbox.files[TARGET] == expected.encode()
+    return {
+        "format": edit_format,
+        "output_tokens": estimate_tokens(json.dumps(output)),
+        "completed": completed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file-lines", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per RPC")
+    parser.add_argument(
+        "--delay", type=float, default=0.05, help="seconds per 16 characters of output"
+    )
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(_bench(fmt, args.file_lines, args.latency, args.delay))
+        for fmt in ("files", "blocks")
+    ]
+
+    print()
+    for r in results:
+        print(
+            f"{r['format']:>6}: ~{r['output_tokens']:6d} output tokens  "
+            f"applied in {r['completed'] * 1000:7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Time-to-preview for a multi-file generation, writing files after the stream
+ends versus as each file completes during the stream.
+
+    python -m benchmarks.bench_incremental_apply --files 8 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+from .fake_llm import FakeModelClient, make_partials
+from .fake_sandbox import FakeSandbox
+from .fixtures import make_agent, make_project
+
+
+async def _bench(incremental: bool, generated: dict, latency: float, delay: float) -> dict:
+    files = make_project(20)
+    sandbox = FakeSandbox(files, latency=latency)
+    model_client = FakeModelClient(make_partials(files=generated), delay=delay, ttft=0.2)
+    with make_agent(files, model_client, sandbox=sandbox) as agent:
+        agent.incremental_apply = incremental
+
+        start = time.perf_counter()
+        first_applied = None
+        async for message in agent.send_feedback(session_id="session", feedback="Build it"):
+            if message["type"] == "update_file" and message["data"].get("status") and first_applied is None:
+                first_applied = time.perf_counter() - start
+            if message["type"] == "update_completed":
+                completed = time.perf_counter() - start
+                first_applied = first_applied or completed
+
+    assert all(sandbox.files[p] == c.encode() for p, c in generated.items())
+    return {
+        "mode": "incremental" if incremental else "after stream",
+        "first_file": first_applied,
+        "completed": completed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--file-size", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per RPC")
+    parser.add_argument("--delay", type=float, default=0.005, help="seconds between partials")
+    args = parser.parse_args()
+
+    generated = {
+        f"/app/src/components/Generated{i}.tsx": (f"// file {i}\n" * args.file_size)[: args.file_size]
+        for i in range(args.files)
+    }
+    results = [
+        asyncio.run(_bench(False, generated, args.latency, args.delay)),
+        asyncio.run(_bench(True, generated, args.latency, args.delay)),
+    ]
+
+    print()
+    for r in results:
+        print(
+            f"{r['mode']:>12}: first file live {r['first_file'] * 1000:7.0f}ms  "
+            f"all files live {r['completed'] * 1000:7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare tools.read_code over a FakeSandbox: the per-file walk run serially
+and concurrently, and the bulk archive mode.
+
+    python -m benchmarks.bench_load_code --files 100 --latency 0.02 --concurrency 8
+"""
+
+import argparse
+import time
+
+from src.tools import read_code
+
+from .fake_sandbox import FakeSandbox
+from .fixtures import make_project
+
+
+def _run(files: dict, latency: float, bulk: bool, concurrency: int, repeat: int) -> dict:
+    timings, rpcs = [], 0
+    for _ in range(repeat):
+        sandbox = FakeSandbox(files, latency=latency)
+        start = time.perf_counter()
+        file_map, _ = read_code(sandbox, bulk=bulk, concurrency=concurrency)
+        timings.append(time.perf_counter() - start)
+        rpcs = sandbox.rpc_count
+        assert len(file_map) == len(files) - 1
+        assert list(file_map) == sorted(file_map)
+
+    best = min(timings)
+    return {
+        "mode": "bulk" if bulk else f"per-file x{concurrency}",
+        "seconds": best,
+        "files_per_second": (len(files) - 1) / best,
+        "rpcs": rpcs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per RPC")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = make_project(args.files)
+    results = [
+        _run(files, args.latency, bulk=False, concurrency=1, repeat=args.repeat),
+        _run(files, args.latency, bulk=False, concurrency=args.concurrency, repeat=args.repeat),
+        _run(files, args.latency, bulk=True, concurrency=1, repeat=args.repeat),
+    ]
+
+    print(f"\n{args.files} files, {args.latency * 1000:.0f}ms per RPC")
+    for r in results:
+        print(
+            f"{r['mode']:>14}: {r['seconds'] * 1000:8.1f}ms  "
+            f"{r['files_per_second']:8.1f} files/s  {r['rpcs']:4d} RPCs"
+        )
+    for r in results[1:]:
+        print(f"{r['mode']:>14} speedup over serial: {results[0]['seconds'] / r['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Bytes on the wire and JSON encoding time for the AGENT_PARTIAL messages of a
+recorded plan stream, sending the full plan each time versus appended deltas.
+
+    python -m benchmarks.bench_plan_delta --plan-chars 3000 --chunk-chars 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.agent import MessageType
+
+from .fake_llm import DEFAULT_PLAN, FakeModelClient, make_partials
+from .fixtures import make_agent, make_project
+
+
+async def _bench(delta: bool, plan: str, chunk_chars: int) -> dict:
+    model_client = FakeModelClient(make_partials(plan, chunk_chars=chunk_chars), delay=0, ttft=0)
+    with make_agent(make_project(10), model_client) as agent:
+        agent.plan_delta_sessions.update(["session"] if delta else [])
+
+        partials, wire_bytes, encode_seconds, rebuilt = 0, 0, 0.0, ""
+        async for message in agent.send_feedback(session_id="session", feedback="Build it"):
+            if message["type"] != MessageType.AGENT_PARTIAL.value:
+                continue
+
+            start = time.perf_counter()
+            encoded = json.dumps(message)
+            encode_seconds += time.perf_counter() - start
+
+            partials += 1
+            wire_bytes += len(encoded.encode("utf-8"))
+            data = message["data"]
+            rebuilt = data["text"] if "text" in data else rebuilt + data["delta"]
+
+    assert plan.startswith(rebuilt)
+    return {
+        "mode": "delta" if delta else "full",
+        "partials": partials,
+        "bytes": wire_bytes,
+        "encode": encode_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plan-chars", type=int, default=3000)
+    parser.add_argument("--chunk-chars", type=int, default=4, help="characters per partial")
+    args = parser.parse_args()
+
+    plan = (DEFAULT_PLAN + " ") * (args.plan_chars // (len(DEFAULT_PLAN) + 1) + 1)
+    plan = plan[: args.plan_chars]
+    results = [asyncio.run(_bench(delta, plan, args.chunk_chars)) for delta in (False, True)]
+
+    print()
+    for r in results:
+        print(
+            f"{r['mode']:>5}: {r['partials']:5d} partials  {r['bytes'] / 1024:9.1f} KiB  "
+            f"json.dumps {r['encode'] * 1000:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Messages buffered and sent for a generation read by a slow websocket client,
+with every partial buffered for the socket (as when the handler's generator is
+drained eagerly) versus the bounded, coalescing outbound queue.
+
+    python -m benchmarks.bench_slow_client --send-ms 5 --chunk-chars 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.agent import MessageType
+
+from .fake_llm import DEFAULT_PLAN, FakeModelClient, make_partials
+from .fixtures import make_agent, make_project
+
+
+async def _eager(messages, depth: list[int]):
+    """Buffer everything the producer yields, like an unbounded send buffer"""
+    buffer: asyncio.Queue = asyncio.Queue()
+
+    async def produce():
+        async for message in messages:
+            await buffer.put(message)
+            depth[0] = max(depth[0], buffer.qsize())
+        await buffer.put(None)
+
+    producer = asyncio.create_task(produce())
+    while (message := await buffer.get()) is not None:
+        yield message
+    await producer
+
+
+def _rebuild(texts: dict, key, data: dict) -> None:
+    if "delta" in data:
+        assert data["offset"] == len(texts.get(key, "")), "gap in delta stream"
+        texts[key] = texts.get(key, "") + data["delta"]
+    else:
+        texts[key] = data["text"]
+
+
+async def _bench(queued: bool, plan: str, generated: dict, chunk_chars: int, send_ms: float):
+    model_client = FakeModelClient(
+        make_partials(plan, generated, chunk_chars=chunk_chars), delay=0, ttft=0
+    )
+    with make_agent(make_project(10), model_client) as agent:
+        agent.plan_delta_sessions.add("session")
+        agent.file_stream_sessions.add("session")
+
+        depth = [0]
+        if queued:
+            messages = agent.send_feedback(session_id="session", feedback="Build it")
+        else:
+            messages = _eager(
+                agent._send_feedback(session_id="session", feedback="Build it"), depth
+            )
+
+        start = time.perf_counter()
+        sent, wire_bytes, texts, kinds = 0, 0, {}, set()
+        async for message in messages:
+            encoded = json.dumps(message)
+            await asyncio.sleep(send_ms / 1000)
+            sent += 1
+            wire_bytes += len(encoded)
+            kinds.add(message["type"])
+            if message["type"] == MessageType.AGENT_PARTIAL.value:
+                _rebuild(texts, "plan", message["data"])
+            elif message["type"] == MessageType.FILE_DELTA.value:
+                _rebuild(texts, message["data"]["path"], message["data"])
+        elapsed = time.perf_counter() - start
+
+    assert plan.startswith(texts.get("plan", ""))
+    assert all(texts[path] == content for path, content in generated.items())
+    assert {MessageType.AGENT_FINAL.value, MessageType.UPDATE_COMPLETED.value} <= kinds
+    stats = agent.outbound_stats.to_dict()
+    return {
+        "mode": "queued" if queued else "eager",
+        "sent": sent,
+        "bytes": wire_bytes,
+        "max_depth": stats["max_queue_depth"] if queued else depth[0],
+        "coalesced": stats["coalesced"],
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plan-chars", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--chunk-chars", type=int, default=4, help="characters per partial")
+    parser.add_argument("--send-ms", type=float, default=5, help="milliseconds per message sent")
+    args = parser.parse_args()
+
+    plan = ((DEFAULT_PLAN + " ") * (args.plan_chars // len(DEFAULT_PLAN) + 1))[: args.plan_chars]
+    generated = {
+        f"/app/src/components/Generated{i}.tsx": (f"// file {i}\n" * args.file_size)[: args.file_size]
+        for i in range(args.files)
+    }
+    results = [
+        asyncio.run(_bench(queued, plan, generated, args.chunk_chars, args.send_ms))
+        for queued in (False, True)
+    ]
+
+    print()
+    for r in results:
+        print(
+            f"{r['mode']:>6}: {r['sent']:5d} sent  {r['bytes'] / 1024:7.1f} KiB  "
+            f"max depth {r['max_depth']:5d}  coalesced {r['coalesced']:5d}  "
+            f"done in {r['elapsed'] * 1000:7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Requests per second and bytes sent by the frontend's static file server, for
+the original per-request FileResponse handler versus the startup manifest with
+in-memory, precompressed bodies and ETag revalidation. Requests go straight
+to the ASGI app, so this measures the server's own cost per request.
+
+    python -m benchmarks.bench_static --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import string
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+
+from frontend.frontend import create_app
+
+BROWSER_ENCODINGS = "gzip, deflate, br"
+
+
+def make_dist(root: str, js_kib: int) -> dict[str, str]:
+    """A Vite-like build: index.html, hashed JS/CSS bundles and a root-level svg"""
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_letters, k=rng.randint(3, 12))) for _ in range(2000)]
+
+    def code(size: int) -> str:
+        out, total = [], 0
+        while total < size:
+            line = f"const {rng.choice(words)}=({rng.choice(words)})=>{rng.choice(words)}.{rng.choice(words)}({rng.randint(0, 999)});"
+            out.append(line)
+            total += len(line)
+        return "\n".join(out)
+
+    files = {
+        "index.html": (
+            '<!doctype html><html lang="en"><head><meta charset="UTF-8" />'
+            '<link rel="icon" type="image/svg+xml" href="/vite.svg" />'
+            '<script type="module" crossorigin src="/assets/index-3f9a1c7e.js"></script>'
+            '<link rel="stylesheet" crossorigin href="/assets/index-b82d04aa.css">'
+            '</head><body><div id="root"></div></body></html>\n'
+        ),
+        "assets/index-3f9a1c7e.js": code(js_kib * 1024),
+        "assets/index-b82d04aa.css": "\n".join(
+            f".{rng.choice(words)}{{margin:{rng.randint(0, 32)}px;color:#{rng.randint(0, 0xFFFFFF):06x}}}"
+            for _ in range(3000)
+        ),
+        "vite.svg": '<svg xmlns="http://www.w3.org/2000/svg">' + "<path d='M0 0h32v32H0z'/>" * 60 + "</svg>",
+    }
+    for path, content in files.items():
+        full = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(content)
+    return files
+
+
+def legacy_app(root: str) -> FastAPI:
+    """frontend.py as it was: disk lookups and FileResponse on every request"""
+    app = FastAPI()
+    app.mount("/assets", StaticFiles(directory=os.path.join(root, "assets")), name="assets")
+
+    @app.get("/{full_path:path}")
+    async def serve_react_app(full_path: str):
+        file_path = os.path.join(root, full_path)
+        if os.path.isfile(file_path):
+            return FileResponse(file_path)
+        return FileResponse(os.path.join(root, "index.html"))
+
+    return app
+
+
+async def call(app, path: str, headers: dict) -> tuple[int, dict, int]:
+    """One GET through the ASGI interface: status, response headers, body bytes"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+    received = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    status, response_headers, size = 0, {}, 0
+
+    async def send(message):
+        nonlocal status, response_headers, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, size
+
+
+async def _bench(name: str, app, requests: int, concurrency: int) -> dict:
+    pages = ["/", "/create", "/create?session_id=abc"]
+    assets = ["/assets/index-3f9a1c7e.js", "/assets/index-b82d04aa.css", "/vite.svg"]
+
+    # A returning browser revalidates with the ETags it got on its first visit
+    etags = {}
+    for path in pages + assets:
+        _, headers, _ = await call(app, path, {"accept-encoding": BROWSER_ENCODINGS})
+        etags[path] = headers.get("etag")
+
+    rng = random.Random(1)
+    workload = []
+    for _ in range(requests):
+        path = rng.choice(pages + assets)
+        headers = {"accept-encoding": BROWSER_ENCODINGS}
+        if etags[path] and rng.random() < 0.5:
+            headers["if-none-match"] = etags[path]
+        workload.append((path, headers))
+
+    statuses: dict[int, int] = {}
+    sent = 0
+    queue = iter(workload)
+
+    async def worker():
+        nonlocal sent
+        for path, headers in queue:
+            status, _, size = await call(app, path, headers)
+            statuses[status] = statuses.get(status, 0) + 1
+            sent += size
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {"name": name, "rps": requests / elapsed, "bytes": sent, "statuses": statuses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--js-kib", type=int, default=600, help="size of the JS bundle")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_dist(root, args.js_kib)
+        results = [
+            asyncio.run(_bench("before", legacy_app(root), args.requests, args.concurrency)),
+            asyncio.run(_bench("after", create_app(root), args.requests, args.concurrency)),
+        ]
+
+    print()
+    for r in results:
+        statuses = ", ".join(f"{status}: {n}" for status, n in sorted(r["statuses"].items()))
+        print(
+            f"{r['name']:>6}: {r['rps']:8.0f} req/s  {r['bytes'] / 1024 / 1024:8.1f} MiB sent  "
+            f"({statuses})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Stand-in for the BAML async client that streams EditCode partials at a fixed
+pace, so send_feedback can be driven without calling Anthropic.
+"""
+
+import asyncio
+import time
+
+from baml_client import partial_types, types
+
+DEFAULT_PLAN = (
+    "I'll build a dashboard with a header, four stat cards and a line chart "
+    "driven by mock monthly data. The cards use soft shadows and gradient "
+    "accents, and the layout collapses to a single column on mobile."
+)
+
+
+def make_partials(
+    plan: str = DEFAULT_PLAN,
+    files: dict[str, str] | None = None,
+    chunk_chars: int = 16,
+) -> list[partial_types.CodeChanges]:
+    """
+    Build the sequence of partials BAML would yield: the plan growing chunk by
+    chunk, then each file's content growing chunk_chars at a time until it is
+    Complete, which is how GeneratedFile.content streams.
+    """
+    files = files or {"/app/src/App.tsx": "export default function App() {}\n"}
+    partials = []
+
+    for end in range(chunk_chars, len(plan) + chunk_chars, chunk_chars):
+        partials.append(
+            partial_types.CodeChanges(
+                plan=partial_types.StreamState(value=plan[:end], state="Incomplete"),
+                files=[],
+            )
+        )
+
+    done: list[partial_types.GeneratedFile] = []
+    partials.append(
+        partial_types.CodeChanges(
+            plan=partial_types.StreamState(value=plan, state="Complete"), files=[]
+        )
+    )
+    for path, content in files.items():
+        for end in range(chunk_chars, len(content), chunk_chars):
+            growing = partial_types.GeneratedFile(
+                path=path,
+                content=partial_types.StreamState(value=content[:end], state="Incomplete"),
+            )
+            partials.append(
+                partial_types.CodeChanges(
+                    plan=partial_types.StreamState(value=plan, state="Complete"),
+                    files=[*done, growing],
+                )
+            )
+        done = [
+            *done,
+            partial_types.GeneratedFile(
+                path=path, content=partial_types.StreamState(value=content, state="Complete")
+            ),
+        ]
+        partials.append(
+            partial_types.CodeChanges(
+                plan=partial_types.StreamState(value=plan, state="Complete"),
+                files=done,
+            )
+        )
+
+    return partials
+
+
+def make_edit_partials(
+    plan: str = DEFAULT_PLAN,
+    edits: list[tuple[str, str, str]] | None = None,
+    chunk_chars: int = 16,
+) -> list[partial_types.CodeEdits]:
+    """
+    Same as make_partials for EditCodeBlocks: the plan, then each (path,
+    search, replace) block appearing complete (EditBlock is @@stream.done)
+    after one partial per chunk_chars of its search and replace text.
+    """
+    edits = edits or []
+    partials = []
+
+    for end in range(chunk_chars, len(plan) + chunk_chars, chunk_chars):
+        partials.append(
+            partial_types.CodeEdits(
+                plan=partial_types.StreamState(value=plan[:end], state="Incomplete"),
+                edits=[],
+                files=[],
+            )
+        )
+
+    done: list[types.EditBlock] = []
+    partials.append(
+        partial_types.CodeEdits(
+            plan=partial_types.StreamState(value=plan, state="Complete"), edits=[], files=[]
+        )
+    )
+    for path, search, replace in edits:
+        for _ in range((len(search) + len(replace)) // chunk_chars):
+            partials.append(
+                partial_types.CodeEdits(
+                    plan=partial_types.StreamState(value=plan, state="Complete"),
+                    edits=done,
+                    files=[],
+                )
+            )
+        done = [*done, types.EditBlock(path=path, search=search, replace=replace)]
+        partials.append(
+            partial_types.CodeEdits(
+                plan=partial_types.StreamState(value=plan, state="Complete"),
+                edits=done,
+                files=[],
+            )
+        )
+
+    return partials
+
+
+class FakeStream:
+    """
+    Async iterator over recorded partials. With blocking=True each step sleeps
+    with time.sleep, which is what iterating the sync BAML stream inside an
+    async handler amounts to. delays, if given, is the wait before each
+    partial (as recorded) instead of ttft then a fixed delay.
+    """
+
+    def __init__(
+        self,
+        partials: list,
+        delay: float,
+        ttft: float,
+        blocking: bool,
+        delays: list[float] | None = None,
+    ):
+        self.partials = partials
+        self.delay = delay
+        self.ttft = ttft
+        self.blocking = blocking
+        self.delays = delays
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._index >= len(self.partials):
+            raise StopAsyncIteration
+
+        if self.delays is not None:
+            wait = self.delays[self._index]
+        else:
+            wait = self.ttft if self._index == 0 else self.delay
+        if self.blocking:
+            time.sleep(wait)
+        else:
+            await asyncio.sleep(wait)
+
+        partial = self.partials[self._index]
+        self._index += 1
+        return partial
+
+    async def get_final_response(self):
+        async for _ in self:
+            pass
+        last = self.partials[-1]
+        files = [types.GeneratedFile(path=f.path, content=f.content.value) for f in last.files]
+        return types.CodeChanges(
+            plan=last.plan.value, files=files, package_json=last.package_json or ""
+        )
+
+
+class _FakeStreamClient:
+    def __init__(self, client: "FakeModelClient"):
+        self.client = client
+
+    def EditCode(
+        self, history, feedback, code_files, package_json, changed_files, baml_options=None
+    ):
+        return FakeStream(
+            self.client.partials,
+            delay=self.client.delay,
+            ttft=self.client.ttft,
+            blocking=self.client.blocking,
+            delays=self.client.delays,
+        )
+
+    def EditCodeBlocks(
+        self, history, feedback, code_files, package_json, changed_files, baml_options=None
+    ):
+        return FakeStream(
+            self.client.edit_partials,
+            delay=self.client.delay,
+            ttft=self.client.ttft,
+            blocking=self.client.blocking,
+            delays=self.client.edit_delays,
+        )
+
+
+class FakeModelClient:
+    def __init__(
+        self,
+        partials: list | None = None,
+        delay: float = 0.02,
+        ttft: float = 0.5,
+        blocking: bool = False,
+        edit_partials: list | None = None,
+        delays: list[float] | None = None,
+        edit_delays: list[float] | None = None,
+    ):
+        self.partials = partials or make_partials()
+        self.edit_partials = edit_partials or make_edit_partials()
+        self.delays = delays
+        self.edit_delays = edit_delays
+        self.delay = delay
+        self.ttft = ttft
+        self.blocking = blocking
+        self.stream = _FakeStreamClient(self)
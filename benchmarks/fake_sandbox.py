@@ -0,0 +1,251 @@
+"""
+In-memory stand-in for a connected beam SandboxInstance.
+
+Only the surface used by src/tools.py is implemented. Every call that would be
+an RPC against a real sandbox sleeps for `latency` seconds, plus an
+exponentially distributed `jitter` (its mean, in seconds) for a long tail, and
+is counted, so the number of round trips and their cost can be compared
+between code paths.
+"""
+
+import io
+import os
+import posixpath
+import random
+import tarfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+
+@dataclass
+class FakeFileInfo:
+    name: str
+    is_dir: bool
+    size: int
+    mod_time: int = 0
+
+
+class FakeProcess:
+    def __init__(self, exit_code: int, stdout: str = "", stderr: str = ""):
+        self.exit_code = exit_code
+        self.stdout = io.StringIO(stdout)
+        self.stderr = io.StringIO(stderr)
+
+    def wait(self, timeout: float | None = None) -> int:
+        return self.exit_code
+
+
+class FakeFileSystem:
+    def __init__(self, sandbox: "FakeSandbox"):
+        self.sandbox = sandbox
+
+    def list_files(self, sandbox_path: str) -> list[FakeFileInfo]:
+        self.sandbox._rpc("list_files")
+        path = sandbox_path.rstrip("/") or "/"
+        if not self.sandbox._is_dir(path):
+            raise FileNotFoundError(sandbox_path)
+
+        entries = {}
+        prefix = "/" if path == "/" else f"{path}/"
+        for child in list(self.sandbox.files) + list(self.sandbox.dirs):
+            if not child.startswith(prefix) or child == path:
+                continue
+            name = child[len(prefix):].split("/", 1)[0]
+            full = prefix + name
+            if full in self.sandbox.files:
+                entries[name] = FakeFileInfo(name, False, len(self.sandbox.files[full]))
+            else:
+                entries[name] = FakeFileInfo(name, True, 0)
+        return list(entries.values())
+
+    def stat_file(self, sandbox_path: str) -> FakeFileInfo:
+        self.sandbox._rpc("stat_file")
+        name = posixpath.basename(sandbox_path)
+        if sandbox_path in self.sandbox.files:
+            return FakeFileInfo(name, False, len(self.sandbox.files[sandbox_path]))
+        if self.sandbox._is_dir(sandbox_path):
+            return FakeFileInfo(name, True, 0)
+        raise FileNotFoundError(sandbox_path)
+
+    def download_file(self, sandbox_path: str, local_path: str) -> None:
+        self.sandbox._rpc("download_file")
+        if sandbox_path not in self.sandbox.files:
+            raise FileNotFoundError(sandbox_path)
+        # Like the real client: write a sibling file and move it over the
+        # target, so a handle already open on local_path never sees the data
+        temporary = f"{local_path}.download"
+        with open(temporary, "wb") as f:
+            f.write(self.sandbox.files[sandbox_path])
+        os.replace(temporary, local_path)
+
+    def upload_file(self, local_path: str, sandbox_path: str) -> None:
+        self.sandbox._rpc("upload_file")
+        if not self.sandbox._is_dir(posixpath.dirname(sandbox_path)):
+            raise FileNotFoundError(posixpath.dirname(sandbox_path))
+        with open(local_path, "rb") as f:
+            self.sandbox._write(sandbox_path, f.read())
+
+
+class FakeProcessManager:
+    def __init__(self, sandbox: "FakeSandbox"):
+        self.sandbox = sandbox
+
+    def exec(self, *args, cwd: str | None = None, env: dict | None = None) -> FakeProcess:
+        self.sandbox._rpc("exec")
+        handler = getattr(self, f"_{args[0]}", None)
+        if handler is None:
+            return FakeProcess(0)
+        try:
+            return handler(list(args[1:]))
+        except Exception as e:
+            return FakeProcess(2, stderr=str(e))
+
+    def _sh(self, args: list[str]) -> FakeProcess:
+        # Shell snippets (dev server start, readiness probe) always succeed
+        return FakeProcess(0)
+
+    def _mkdir(self, args: list[str]) -> FakeProcess:
+        for path in args:
+            if not path.startswith("-"):
+                self.sandbox._mkdir(path)
+        return FakeProcess(0)
+
+    def _rm(self, args: list[str]) -> FakeProcess:
+        for path in args:
+            if not path.startswith("-"):
+                self.sandbox.files.pop(path, None)
+        return FakeProcess(0)
+
+    def _find(self, args: list[str]) -> FakeProcess:
+        # Supports the `find ROOT -mindepth 1 ( -name X -o ... ) -prune -o -printf`
+        # form used for file trees; the printf format is fixed to "%y\t%s\t%p\n"
+        root = args[0].rstrip("/")
+        pruned = {args[i + 1] for i, arg in enumerate(args) if arg == "-name"}
+        if not self.sandbox._is_dir(root):
+            return FakeProcess(1, stderr=f"find: '{root}': No such file or directory")
+
+        paths = {p for p in self.sandbox.files if p.startswith(f"{root}/")}
+        paths |= {d for d in self.sandbox.dirs if d.startswith(f"{root}/")}
+        for path in list(paths):
+            parent = posixpath.dirname(path)
+            while parent.startswith(f"{root}/"):
+                paths.add(parent)
+                parent = posixpath.dirname(parent)
+
+        lines = []
+        for path in sorted(paths):
+            parts = posixpath.relpath(path, root).split("/")
+            if pruned.intersection(parts):
+                continue
+            if path in self.sandbox.files:
+                lines.append(f"f\t{len(self.sandbox.files[path])}\t{path}")
+            else:
+                lines.append(f"d\t4096\t{path}")
+        return FakeProcess(0, stdout="".join(f"{line}\n" for line in lines))
+
+    def _tar(self, args: list[str]) -> FakeProcess:
+        flags, archive_path, root, members = args[0], None, "/", []
+        rest = args[1:]
+        while rest:
+            arg = rest.pop(0)
+            if arg == "-C":
+                root = rest.pop(0)
+            elif archive_path is None and "f" in flags:
+                archive_path = arg
+            else:
+                members.append(arg)
+
+        if "c" in flags:
+            return self._tar_create(archive_path, root, members, gzip="z" in flags)
+        return self._tar_extract(archive_path, root, verbose="v" in flags)
+
+    def _tar_create(self, archive_path, root, members, gzip) -> FakeProcess:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz" if gzip else "w") as archive:
+            for member in members:
+                base = posixpath.join(root, member)
+                if base not in self.sandbox.files and not self.sandbox._is_dir(base):
+                    raise FileNotFoundError(base)
+                for path, content in sorted(self.sandbox.files.items()):
+                    if path == base or path.startswith(f"{base}/"):
+                        info = tarfile.TarInfo(posixpath.relpath(path, root))
+                        info.size = len(content)
+                        archive.addfile(info, io.BytesIO(content))
+        self.sandbox.files[archive_path] = buffer.getvalue()
+        return FakeProcess(0)
+
+    def _tar_extract(self, archive_path, root, verbose) -> FakeProcess:
+        data = self.sandbox.files[archive_path]
+        extracted = []
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+            for member in archive:
+                path = posixpath.normpath(posixpath.join(root, member.name))
+                if member.isdir():
+                    self.sandbox._mkdir(path)
+                elif member.isfile():
+                    self.sandbox._mkdir(posixpath.dirname(path))
+                    self.sandbox._write(path, archive.extractfile(member).read())
+                extracted.append(member.name)
+        return FakeProcess(0, stdout="\n".join(extracted) + "\n" if verbose else "")
+
+
+class FakeSandbox:
+    """A sandbox whose filesystem is a dict of absolute path -> bytes."""
+
+    def __init__(
+        self,
+        files: dict[str, bytes] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.files: dict[str, bytes] = dict(files or {})
+        self.dirs: set[str] = {"/", "/tmp"}
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.rpc_counts: dict[str, int] = {}
+        self.id = f"fake-{uuid.uuid4().hex[:8]}"
+        self.fs = FakeFileSystem(self)
+        self.process = FakeProcessManager(self)
+        self._lock = threading.Lock()
+
+    @property
+    def rpc_count(self) -> int:
+        return sum(self.rpc_counts.values())
+
+    def sandbox_id(self) -> str:
+        return self.id
+
+    def update_ttl(self, ttl: int) -> None:
+        self._rpc("update_ttl")
+
+    def expose_port(self, port: int) -> str:
+        self._rpc("expose_port")
+        return f"https://{self.id}-{port}.fake.beam.cloud"
+
+    def _rpc(self, name: str) -> None:
+        with self._lock:
+            self.rpc_counts[name] = self.rpc_counts.get(name, 0) + 1
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.expovariate(1 / self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _is_dir(self, path: str) -> bool:
+        path = path.rstrip("/") or "/"
+        if path in self.dirs:
+            return True
+        prefix = f"{path}/"
+        return any(p.startswith(prefix) for p in self.files)
+
+    def _mkdir(self, path: str) -> None:
+        while path and path != "/":
+            self.dirs.add(path)
+            path = posixpath.dirname(path)
+
+    def _write(self, path: str, content: bytes) -> None:
+        self.files[path] = content
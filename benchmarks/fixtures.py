@@ -0,0 +1,89 @@
+"""Synthetic React/Vite project trees shaped like the sandbox template."""
+
+import json
+from collections.abc import Iterable
+from contextlib import contextmanager
+
+from src.handles import sandbox_handles
+from src.tools import DEFAULT_CODE_PATH, DEFAULT_PROJECT_ROOT
+
+from .fake_sandbox import FakeSandbox
+
+_COMPONENT = """import {{ cn }} from "@/lib/utils";
+
+export function {name}({{ className }}: {{ className?: string }}) {{
+  return (
+    <div className={{cn("rounded-lg border p-4 shadow-sm", className)}}>
+      {name}
+    </div>
+  );
+}}
+"""
+
+
+def make_project(n_files: int = 60, file_size: int = 2048) -> dict[str, bytes]:
+    """
+    Build a project with roughly the layout of the template: a handful of top
+    level files, most of the rest under components/ui, a few pages.
+    """
+    files = {
+        f"{DEFAULT_PROJECT_ROOT}/package.json": json.dumps(
+            {"name": "app", "dependencies": {"react": "^18.2.0"}}, indent=2
+        ).encode(),
+        f"{DEFAULT_CODE_PATH}/App.tsx": b'import { Button } from "@/components/ui/button";\n',
+        f"{DEFAULT_CODE_PATH}/main.tsx": b'import App from "./App";\n',
+        f"{DEFAULT_CODE_PATH}/index.css": b"@tailwind base;\n",
+        f"{DEFAULT_CODE_PATH}/lib/utils.ts": b"export const cn = (...c: string[]) => c.join(' ');\n",
+    }
+
+    dirs = ["components/ui", "components/ui", "components/ui", "pages", "hooks"]
+    i = 0
+    while len(files) - 1 < n_files:
+        name = f"Component{i}"
+        body = _COMPONENT.format(name=name)
+        body = (body * (file_size // len(body) + 1))[:file_size]
+        files[f"{DEFAULT_CODE_PATH}/{dirs[i % len(dirs)]}/{name}.tsx"] = body.encode()
+        i += 1
+
+    return files
+
+
+@contextmanager
+def make_agent(
+    files: dict[str, bytes],
+    model_client,
+    sandbox: FakeSandbox | None = None,
+    session_ids: Iterable[str] = ("session",),
+):
+    """
+    An Agent on model_client with its sessions set up and their code already
+    loaded. Every session uses sandbox if one is given, or a FakeSandbox of
+    its own holding files. sandbox_handles.connect_fn is restored on exit.
+    """
+    from src.agent import Agent
+
+    session_ids = list(session_ids)
+    sandboxes = {}
+
+    def connect(sandbox_id: str) -> FakeSandbox:
+        if sandbox is not None:
+            return sandbox
+        return sandboxes.setdefault(sandbox_id, FakeSandbox(files))
+
+    code = dict(files)
+    package_json = code.pop(f"{DEFAULT_PROJECT_ROOT}/package.json").decode()
+
+    previous = sandbox_handles.connect_fn
+    sandbox_handles.connect_fn = connect
+    try:
+        agent = Agent()
+        agent.model_client = model_client
+        for session_id in session_ids:
+            sandbox_handles.invalidate(f"sandbox-{session_id}")
+            agent.sessions.put(session_id, {"sandbox_id": f"sandbox-{session_id}", "url": ""})
+            agent.snapshots.get(session_id).load(code, package_json)
+        yield agent
+    finally:
+        for session_id in session_ids:
+            sandbox_handles.invalidate(f"sandbox-{session_id}")
+        sandbox_handles.connect_fn = previous
@@ -0,0 +1,154 @@
+"""
+Record real EditCode / EditCodeBlocks streams and replay them with their
+original timing, so send_feedback can be benchmarked against what the model
+actually produces (chunk sizes, pauses, time to first token) without calling
+Anthropic on every run.
+
+A recording is JSON lines: a header {"function": ...} followed by one
+{"t": seconds since the call, "partial": ...} per partial.
+
+    ANTHROPIC_API_KEY=... python -m benchmarks.recorded_stream \\
+        --out recordings/dashboard.jsonl --feedback "Build a sales dashboard"
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from itertools import pairwise
+
+from baml_client import partial_types
+
+from .fake_llm import FakeModelClient
+
+_PARTIAL_TYPES = {
+    "EditCode": partial_types.CodeChanges,
+    "EditCodeBlocks": partial_types.CodeEdits,
+}
+
+
+@dataclass
+class Recording:
+    function: str
+    partials: list
+    offsets: list[float]
+
+    def delays(self, speed: float = 1.0) -> list[float]:
+        """Wait before each partial, scaled by 1 / speed"""
+        return [(t - p) / speed for p, t in pairwise([0.0, *self.offsets])]
+
+
+def load_recording(path: str) -> Recording:
+    with open(path) as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+
+    function = lines[0]["function"]
+    partial_type = _PARTIAL_TYPES[function]
+    return Recording(
+        function=function,
+        partials=[partial_type.model_validate(line["partial"]) for line in lines[1:]],
+        offsets=[line["t"] for line in lines[1:]],
+    )
+
+
+def replay_client(
+    recording: Recording, edit_recording: Recording | None = None, speed: float = 1.0
+) -> FakeModelClient:
+    """A model client that streams the recorded partials at the recorded pace"""
+    recordings = {r.function: r for r in (recording, edit_recording) if r is not None}
+    code, blocks = recordings.get("EditCode"), recordings.get("EditCodeBlocks")
+    return FakeModelClient(
+        partials=code.partials if code else None,
+        delays=code.delays(speed) if code else None,
+        edit_partials=blocks.partials if blocks else None,
+        edit_delays=blocks.delays(speed) if blocks else None,
+    )
+
+
+class _RecordingStream:
+    def __init__(self, stream, function: str, path: str):
+        self.stream = stream
+        self.function = function
+        self.path = path
+        self._start = time.perf_counter()
+
+    async def __aiter__(self):
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"function": self.function}) + "\n")
+            async for partial in self.stream:
+                elapsed = time.perf_counter() - self._start
+                line = {"t": elapsed, "partial": partial.model_dump(mode="json")}
+                f.write(json.dumps(line) + "\n")
+                yield partial
+
+    async def get_final_response(self):
+        return await self.stream.get_final_response()
+
+
+class _RecordingStreamClient:
+    def __init__(self, client: "RecordingModelClient"):
+        self.client = client
+
+    def EditCode(self, *args, **kwargs):
+        stream = self.client.inner.stream.EditCode(*args, **kwargs)
+        return _RecordingStream(stream, "EditCode", self.client.next_path())
+
+    def EditCodeBlocks(self, *args, **kwargs):
+        stream = self.client.inner.stream.EditCodeBlocks(*args, **kwargs)
+        return _RecordingStream(stream, "EditCodeBlocks", self.client.next_path())
+
+
+class RecordingModelClient:
+    """
+    Wraps a model client and writes every stream it opens to a recording.
+    The first stream goes to path; any further ones in the same run (an edit
+    block fallback) to path with a numeric suffix.
+    """
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self.paths: list[str] = []
+        self.stream = _RecordingStreamClient(self)
+
+    def next_path(self) -> str:
+        stem, dot, ext = self.path.rpartition(".")
+        path = self.path if not self.paths else f"{stem}.{len(self.paths)}{dot}{ext}"
+        self.paths.append(path)
+        return path
+
+
+async def _record(out: str, feedback: str, edit_format: str, files: int) -> list[str]:
+    from baml_client.async_client import b
+
+    from .fixtures import make_agent, make_project
+
+    with make_agent(make_project(files), RecordingModelClient(b, out)) as agent:
+        agent.edit_format = edit_format
+        async for _ in agent.send_feedback(session_id="session", feedback=feedback):
+            pass
+        return agent.model_client.paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--out", required=True, help="recording to write")
+    parser.add_argument("--feedback", required=True)
+    parser.add_argument("--edit-format", choices=("files", "blocks"), default="files")
+    parser.add_argument("--files", type=int, default=20, help="files in the fixture project")
+    args = parser.parse_args()
+
+    paths = asyncio.run(_record(args.out, args.feedback, args.edit_format, args.files))
+    for path in paths:
+        recording = load_recording(path)
+        print(
+            f"Recorded {len(recording.partials)} {recording.function} partials "
+            f"over {recording.offsets[-1] if recording.offsets else 0:.1f}s to {path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Latency percentiles for the agent's sandbox and generation paths against the
+fake sandbox, per operation and per send_feedback stage. Results can be written
+as JSON and compared with a run from another commit.
+
+    python -m benchmarks.run --iterations 20 --latency 0.02 --jitter 0.01 --json after.json
+    python -m benchmarks.run --recording recordings/dashboard.jsonl --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+
+from src.agent import Agent, MessageType
+
+from .fake_llm import FakeModelClient, make_partials
+from .fake_sandbox import FakeSandbox
+from .fixtures import make_agent, make_project
+from .recorded_stream import load_recording, replay_client
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Timings:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float | None) -> None:
+        if seconds is not None:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def to_dict(self) -> dict:
+        return {name: summarize(samples) for name, samples in self.samples.items()}
+
+
+async def _timed(timings: Timings, name: str, coro):
+    start = time.perf_counter()
+    result = await coro
+    timings.add(name, time.perf_counter() - start)
+    return result
+
+
+async def _send_feedback(agent: Agent, stages: Timings, feedback: str) -> None:
+    start = time.perf_counter()
+    first = {}
+    async for message in agent.send_feedback(session_id="session", feedback=feedback):
+        kind = message["type"]
+        if kind == MessageType.UPDATE_FILE.value and message["data"].get("status"):
+            kind = "file_applied"
+        first.setdefault(kind, time.perf_counter() - start)
+
+    stages.add("first_partial", first.get(MessageType.AGENT_PARTIAL.value))
+    stages.add("plan_final", first.get(MessageType.AGENT_FINAL.value))
+    stages.add("first_file_delta", first.get(MessageType.FILE_DELTA.value))
+    stages.add("first_file_applied", first.get("file_applied"))
+    stages.add("completed", first.get(MessageType.UPDATE_COMPLETED.value))
+
+
+async def run(args) -> dict:
+    project = make_project(args.files)
+    sandbox = FakeSandbox(project, latency=args.latency, jitter=args.jitter, seed=args.seed)
+    if args.recording:
+        model_client = replay_client(load_recording(args.recording), speed=args.speed)
+    else:
+        generated = {
+            f"/app/src/components/Generated{i}.tsx": (f"// file {i}\n" * 512)[:2048]
+            for i in range(4)
+        }
+        model_client = FakeModelClient(
+            make_partials(files=generated), delay=args.delay, ttft=args.ttft
+        )
+
+    operations, stages = Timings(), Timings()
+    with make_agent(project, model_client, sandbox=sandbox) as agent:
+        agent.file_stream_sessions.add("session")
+        agent.plan_delta_sessions.add("session")
+
+        for i in range(args.iterations):
+            # Cold paths: drop what the agent cached so each call goes to the sandbox
+            agent.snapshots.drop("session")
+            await _timed(operations, "load_code", agent.load_code(session_id="session"))
+
+            agent.file_trees.drop("session")
+            await _timed(operations, "get_file_tree", agent.get_file_tree(session_id="session"))
+
+            edited = {f"/app/src/pages/Edited{j}.tsx": f"// iteration {i}\n" for j in range(4)}
+            await _timed(
+                operations, "edit_code", agent.edit_code(session_id="session", code_map=edited)
+            )
+
+            # Distinct feedback so the response cache never answers
+            await _timed(
+                operations,
+                "send_feedback",
+                _send_feedback(agent, stages, f"Iteration {i}: build it"),
+            )
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "iterations": args.iterations,
+            "files": args.files,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "seed": args.seed,
+            "stream": args.recording or "synthetic",
+            "speed": args.speed if args.recording else None,
+        },
+        "operations": operations.to_dict(),
+        "stages": stages.to_dict(),
+        "rpc_counts": sandbox.rpc_counts,
+    }
+
+
+def _print_table(title: str, results: dict, baseline: dict | None) -> None:
+    print(f"\n{title:<20} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, summary in results.items():
+        if not summary.get("count"):
+            continue
+        row = f"{name:<20}"
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            row += f" {summary[key]:7.1f}ms"
+        before = (baseline or {}).get(name)
+        if before and before.get("count"):
+            change = (summary["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+            row += f"   p50 {change:+6.1f}% vs {before['p50_ms']:.1f}ms"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--files", type=int, default=60, help="files in the fixture project")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per RPC")
+    parser.add_argument("--jitter", type=float, default=0.01, help="mean extra seconds per RPC")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.005, help="seconds between partials")
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--recording", help="replay a recorded EditCode stream instead")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results JSON from an earlier run")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nComparing with {baseline.get('commit')} ({args.compare})")
+
+    _print_table("operation", results["operations"], baseline and baseline["operations"])
+    _print_table("send_feedback stage", results["stages"], baseline and baseline["stages"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,165 @@
+import gzip
+import hashlib
+import mimetypes
 import os
+from dataclasses import dataclass, field
 
 from beam import Image, PythonVersion, asgi
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, Response
 
-app = FastAPI()
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 build_dir = os.path.join(os.path.dirname(__file__), "dist")
-app.mount(
-    "/assets", StaticFiles(directory=os.path.join(build_dir, "assets")), name="assets"
+
+# Files up to this size are served from memory, larger ones from disk
+MAX_INLINE_BYTES = int(os.getenv("STATIC_MAX_INLINE_BYTES", str(2 * 1024 * 1024)))
+MIN_COMPRESS_BYTES = 1024
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
 )
 
+# Vite fingerprints everything under /assets, so those never change in place
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@dataclass
+class StaticFile:
+    path: str
+    media_type: str
+    etag: str
+    cache_control: str
+    body: bytes | None = None
+    # Precompressed bodies by content-coding, only kept when smaller
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def headers(self, encoding: str | None = None) -> dict:
+        etag = self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def etags(self) -> set[str]:
+        return {self.etag} | {self.headers(encoding)["ETag"] for encoding in self.encoded}
+
+
+def _compress(data: bytes) -> dict[str, bytes]:
+    encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in encoded.items() if len(body) < len(data)}
+
+
+def build_manifest(root: str) -> dict[str, StaticFile]:
+    """Every file under root by URL path, hashed and compressed once at startup"""
+    manifest = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            url_path = os.path.relpath(path, root).replace(os.sep, "/")
+            media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+            with open(path, "rb") as f:
+                data = f.read()
+
+            entry = StaticFile(
+                path=path,
+                media_type=media_type,
+                etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+                cache_control=IMMUTABLE if url_path.startswith("assets/") else REVALIDATE,
+            )
+            if len(data) <= MAX_INLINE_BYTES:
+                entry.body = data
+                if len(data) >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE_TYPES):
+                    entry.encoded = _compress(data)
+            manifest[url_path] = entry
+
+    return manifest
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=") if params.strip().startswith("q=") else "1"
+        try:
+            if float(q) > 0:
+                accepted.add(coding.strip().lower())
+        except ValueError:
+            continue
+    return accepted
 
-@app.get("/health")
-async def health():
-    return {"status": "ok"}
 
+def _not_modified(request: Request, entry: StaticFile) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or bool(tags & entry.etags())
+
+
+def serve(request: Request, entry: StaticFile) -> Response:
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    encoding = next((e for e in ("br", "gzip") if e in entry.encoded and e in accepted), None)
+
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=entry.headers(encoding))
+
+    if entry.body is None:
+        return FileResponse(entry.path, media_type=entry.media_type, headers=entry.headers())
+
+    body = entry.encoded[encoding] if encoding else entry.body
+    return Response(body, media_type=entry.media_type, headers=entry.headers(encoding))
+
+
+def create_app(root: str) -> FastAPI:
+    app = FastAPI()
+    manifest = build_manifest(root) if os.path.isdir(root) else {}
+    print(
+        f"Serving {len(manifest)} static files from {root} "
+        f"({sum(len(e.body or b'') for e in manifest.values()) // 1024} KiB in memory)"
+    )
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+    async def serve_react_app(full_path: str, request: Request):
+        # Root-level static files (e.g., /vite.svg) and hashed assets
+        entry = manifest.get(full_path)
+        if entry is not None:
+            return serve(request, entry)
+
+        # A missing asset is a stale page asking for an old build, not a route
+        if full_path.startswith("assets/") or "index.html" not in manifest:
+            return Response(status_code=404)
+
+        # Fallback to index.html for SPA
+        return serve(request, manifest["index.html"])
+
+    return app
 
-@app.get("/{full_path:path}")
-async def serve_react_app(full_path: str, request: Request):
-    # Serve root-level static files (e.g., /vite.svg)
-    file_path = os.path.join(build_dir, full_path)
-    if os.path.isfile(file_path):
-        return FileResponse(file_path)
 
-    # Fallback to index.html for SPA
-    index_path = os.path.join(build_dir, "index.html")
-    return FileResponse(index_path)
+app = create_app(build_dir)
 
 
 image = Image(
     python_version=PythonVersion.Python311,
+    python_packages=["brotli"],
 )
 
 
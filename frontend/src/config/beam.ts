@@ -1,4 +1,6 @@
 export const BEAM_CONFIG = {
   WS_URL: import.meta.env.VITE_BEAM_WS_URL,
   TOKEN: import.meta.env.VITE_BEAM_TOKEN,
+  // Ask the agent for a STATS message (per-stage timings) after each generation
+  STATS: import.meta.env.VITE_AGENT_STATS === "true",
 } as const;
\ No newline at end of file
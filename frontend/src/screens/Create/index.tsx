@@ -32,6 +32,19 @@ const Create = () => {
   const initialPromptSent = useRef(false);
   const iframeRef = useRef<HTMLIFrameElement>(null);
 
+  // Plan text per streaming message, rebuilt from AGENT_PARTIAL deltas
+  const planTextRef = useRef(new Map<string, string>());
+  const resyncPendingRef = useRef(new Set<string>());
+  const sendRef = useRef<((type: MessageType, data: Record<string, any>) => void) | null>(null);
+
+  // Files the agent generated, rebuilt from FILE_DELTA and served instead of
+  // fetching them back from the sandbox
+  const generatedFilesRef = useRef(
+    new Map<string, { text: string; language: string; broken: boolean }>()
+  );
+  const currentFileRef = useRef<string | null>(null);
+  currentFileRef.current = currentFile;
+
   const location = useLocation();
   const [searchParams] = useSearchParams();
   const sessionId = searchParams.get("session_id") || location.state?.session_id;
@@ -56,6 +69,56 @@ const Create = () => {
     }
   }, [iframeUrl]);
 
+  // Full text for an AGENT_PARTIAL, or null if it can't be rebuilt yet
+  const applyPlanDelta = (id: string, data: Record<string, any>): string | null => {
+    if (typeof data.text === "string") {
+      resyncPendingRef.current.delete(id);
+      planTextRef.current.set(id, data.text);
+      return data.text;
+    }
+    if (typeof data.delta !== "string" || resyncPendingRef.current.has(id)) return null;
+
+    const current = planTextRef.current.get(id) ?? "";
+    if (data.offset !== current.length) {
+      // Missed part of the plan, ask for the full text once
+      resyncPendingRef.current.add(id);
+      sendRef.current?.(MessageType.RESYNC, { session_id: sessionId, id });
+      return null;
+    }
+
+    const text = current + data.delta;
+    planTextRef.current.set(id, text);
+    return text;
+  };
+
+  const applyFileDelta = (data: Record<string, any>) => {
+    const { path } = data;
+    if (typeof path !== "string") return null;
+
+    const previous = generatedFilesRef.current.get(path);
+    const file = {
+      text: previous?.text ?? "",
+      language: data.language ?? previous?.language ?? "javascript",
+      broken: previous?.broken ?? false,
+    };
+    if (typeof data.text === "string") {
+      file.text = data.text;
+      file.broken = false;
+    } else if (data.offset === 0) {
+      // A new generation of this file starts over rather than appending
+      file.text = data.delta ?? "";
+      file.broken = false;
+    } else if (file.broken || data.offset !== file.text.length) {
+      // Missed a chunk, this file has to be fetched from the sandbox instead
+      file.broken = true;
+    } else {
+      file.text += data.delta ?? "";
+    }
+
+    generatedFilesRef.current.set(path, file);
+    return file;
+  };
+
   const messageHandlers = {
     [MessageType.INIT]: (message: any) => {
       const id = message.id;
@@ -94,10 +157,11 @@ const Create = () => {
     },
 
     [MessageType.AGENT_PARTIAL]: (message) => {
-      const { text } = message.data;
       const { id } = message;
+      if (!id) return;
 
-      if (!id || !text?.trim()) return;
+      const text = applyPlanDelta(id, message.data);
+      if (!text?.trim()) return;
 
       setMessages((prev) => {
         const existingIndex = prev.findIndex((msg) => msg.id === id);
@@ -138,6 +202,8 @@ const Create = () => {
       const { id } = message;
 
       if (!id || !text?.trim()) return;
+      planTextRef.current.delete(id);
+      resyncPendingRef.current.delete(id);
 
       setMessages((prev) => {
         const existingIndex = prev.findIndex((msg) => msg.id === id);
@@ -217,9 +283,29 @@ const Create = () => {
       });
     },
 
+    [MessageType.FILE_DELTA]: (message) => {
+      const file = applyFileDelta(message.data);
+      if (!file || file.broken || currentFileRef.current !== message.data.path) return;
+
+      setFileContent(file.text);
+      setFileLanguage(file.language);
+    },
+
     [MessageType.UPDATE_COMPLETED]: (message) => {
       setIsUpdateInProgress(false);
       const { id } = message;
+      // The sandbox doesn't have what was generated for these
+      for (const path of message.data.failed ?? []) {
+        generatedFilesRef.current.delete(path);
+      }
+      // The agent kept the existing file instead of the omitted-contents
+      // placeholder the stream carried, so show the real contents again
+      for (const path of message.data.rejected ?? []) {
+        generatedFilesRef.current.delete(path);
+        if (currentFileRef.current === path) {
+          sendRef.current?.(MessageType.GET_FILE_CONTENT, { session_id: sessionId, path });
+        }
+      }
 
       setMessages((prev) => {
         const filtered = prev.filter((msg) => msg.type !== MessageType.UPDATE_FILE);
@@ -258,6 +344,10 @@ const Create = () => {
       refreshIframe();
     },
 
+    [MessageType.STATS]: (message) => {
+      console.info("Generation stats:", message.data);
+    },
+
     [MessageType.FILE_TREE]: (message) => {
       setFileTree(message.data.tree || []);
     },
@@ -323,6 +413,8 @@ const Create = () => {
     },
   });
 
+  sendRef.current = send;
+
   // Handler functions for code preview
   const handleRequestFileTree = useCallback(() => {
     if (!sessionId) return;
@@ -331,11 +423,20 @@ const Create = () => {
 
   const handleRequestFileContent = useCallback((path: string) => {
     if (!sessionId) return;
+
+    const generated = generatedFilesRef.current.get(path);
+    if (generated && !generated.broken) {
+      setCurrentFile(path);
+      setFileContent(generated.text);
+      setFileLanguage(generated.language);
+      return;
+    }
     send(MessageType.GET_FILE_CONTENT, { session_id: sessionId, path });
   }, [send, sessionId]);
 
   const handleSaveFile = useCallback((path: string, content: string) => {
     if (!sessionId) return;
+    generatedFilesRef.current.delete(path);
     setIsSaving(true);
     send(MessageType.SAVE_FILE, { session_id: sessionId, path, content });
   }, [send, sessionId]);
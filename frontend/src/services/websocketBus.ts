@@ -1,6 +1,7 @@
 import { MessageBus } from "./messageBus";
 import type { Message } from "../types/messages";
 import { MessageType, createMessage } from "../types/messages";
+import { BEAM_CONFIG } from "../config/beam";
 
 export interface WebSocketBusConfig {
   url: string;
@@ -71,9 +72,13 @@ export class WebSocketBus {
       this.reconnectAttempts = 0;
       this.config.messageBus.setConnected(true);
 
+      // plan_delta: AGENT_PARTIAL carries only the appended text and its offset
+      // file_stream: generated files arrive as FILE_DELTA while the agent writes them
+      // stats: a STATS message with per-stage timings follows each generation
+      const capabilities = ["plan_delta", "file_stream", ...(BEAM_CONFIG.STATS ? ["stats"] : [])];
       const initData = this.config.sessionId
-        ? { session_id: this.config.sessionId }
-        : {};
+        ? { session_id: this.config.sessionId, capabilities }
+        : { capabilities };
       console.log(
         "Sending INIT message with session_id:",
         this.config.sessionId
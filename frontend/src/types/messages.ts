@@ -17,6 +17,9 @@ export enum MessageType {
   FILE_CONTENT = "file_content",
   SAVE_FILE = "save_file",
   FILE_SAVED = "file_saved",
+  RESYNC = "resync",
+  FILE_DELTA = "file_delta",
+  STATS = "stats",
   ERROR = "error",
   PING = "ping",
 }
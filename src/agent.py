@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import tempfile
@@ -7,12 +8,53 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
-from beam import Image, PythonVersion, realtime, Sandbox
+from baml_py import Collector
+from beam import Image, PythonVersion, realtime
 
-from baml_client.sync_client import BamlSyncClient, b
+from baml_client.async_client import BamlAsyncClient, b
 from baml_client.types import Message as ConvoMessage
 
-from .tools import create_app_environment, edit_code, load_code, DEFAULT_CODE_PATH
+from .context import OMITTED, ContextSelector, estimate_tokens
+from .deltas import FILE_STREAM, PLAN_DELTA, DeltaEncoder
+from .edits import EditStats, apply_edit_stream
+from .executor import Lane, LaneExecutor
+from .file_tree import FileTreeCache
+from .handles import sandbox_handles
+from .history import SessionHistory
+from .keepalive import keepalive
+from .lifecycle import SessionLifecycle
+from .outbound import OutboundQueue, OutboundStats
+from .pool import SandboxPool
+from .prompt_cache import PromptLayout, turn_usage
+from .response_cache import CachedResponse, ResponseCache, replay, response_key
+from .session_store import make_session_store
+from .snapshot import SnapshotCache, content_hash
+from .telemetry import make_exporter, tracer
+from .tools import DEFAULT_CODE_PATH, build_file_tree, edit_code, load_code
+
+SANDBOX_POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", "2"))
+INTERACTIVE_IO_WORKERS = int(os.getenv("INTERACTIVE_IO_WORKERS", "16"))
+BULK_IO_WORKERS = int(os.getenv("BULK_IO_WORKERS", "8"))
+PROVISION_IO_WORKERS = int(os.getenv("PROVISION_IO_WORKERS", "4"))
+FETCH_IO_WORKERS = int(os.getenv("FETCH_IO_WORKERS", "8"))
+INCREMENTAL_APPLY = os.getenv("INCREMENTAL_APPLY", "1") == "1"
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "24000"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "600"))
+# "files" regenerates whole files, "blocks" asks for search/replace edits
+EDIT_FORMAT = os.getenv("EDIT_FORMAT", "files")
+# memory:// or sqlite:///path/to/sessions.db
+SESSION_STORE = os.getenv("SESSION_STORE", "memory://")
+KEEP_WARM_SECONDS = int(os.getenv("KEEP_WARM_SECONDS", "300"))
+# Per-session caches this replica may hold before evicting idle sessions early
+SESSION_MEMORY_HIGH_WATER = int(os.getenv("SESSION_MEMORY_HIGH_WATER", str(256 * 1024 * 1024)))
+# Characters of a generated file to accumulate before sending a FILE_DELTA
+FILE_DELTA_CHARS = int(os.getenv("FILE_DELTA_CHARS", "256"))
+# Messages a slow client may fall behind by before send_feedback waits for it
+OUTBOUND_QUEUE_DEPTH = int(os.getenv("OUTBOUND_QUEUE_DEPTH", "64"))
+# file:///path/to/traces.jsonl or an OTLP/HTTP endpoint like http://localhost:4318/v1/traces
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
 
 
 class MessageType(Enum):
@@ -31,6 +73,9 @@ class MessageType(Enum):
     FILE_CONTENT = "file_content"
     SAVE_FILE = "save_file"
     FILE_SAVED = "file_saved"
+    RESYNC = "resync"
+    FILE_DELTA = "file_delta"
+    STATS = "stats"
     ERROR = "error"
 
 
@@ -70,49 +115,197 @@ class Message:
 
 class Agent:
     def __init__(self):
-        self.model_client: BamlSyncClient = b
-        self.session_data: dict = {}  
-        self.history: list[dict] = []
+        self.model_client: BamlAsyncClient = b
+        # Sessions outlive the replica with a durable store, and expire with the sandbox
+        self.sessions = make_session_store(SESSION_STORE, ttl=KEEP_WARM_SECONDS)
+        self.histories: dict[str, SessionHistory] = {}
+        self.sandbox_pool = SandboxPool(size=SANDBOX_POOL_SIZE)
+        self.snapshots = SnapshotCache()
+        self.file_trees = FileTreeCache()
+        self.executor = LaneExecutor(
+            interactive_workers=INTERACTIVE_IO_WORKERS,
+            bulk_workers=BULK_IO_WORKERS,
+            provision_workers=PROVISION_IO_WORKERS,
+            fetch_workers=FETCH_IO_WORKERS,
+        )
+        self.incremental_apply = INCREMENTAL_APPLY
+        self.context_selector = ContextSelector(token_budget=CONTEXT_TOKEN_BUDGET)
+        self.prompt_layout = PromptLayout()
+        self.edit_format = EDIT_FORMAT
+        self.edit_stats = EditStats()
+        # Sessions whose client asked for append-only AGENT_PARTIAL deltas at INIT,
+        # and the latest plan stream per session so a client can resync
+        self.plan_delta_sessions: set[str] = set()
+        self.plan_streams: dict[str, tuple[str, DeltaEncoder]] = {}
+        # Sessions whose client renders files from FILE_DELTA as they are generated
+        self.file_stream_sessions: set[str] = set()
+        self.outbound_stats = OutboundStats()
+        # Sessions whose client asked for a STATS message after each generation
+        self.stats_sessions: set[str] = set()
+        if TRACE_EXPORT:
+            tracer.exporter = make_exporter(TRACE_EXPORT)
+
+        self.lifecycle = SessionLifecycle(
+            idle_seconds=KEEP_WARM_SECONDS,
+            high_water_bytes=SESSION_MEMORY_HIGH_WATER,
+            release_fn=sandbox_handles.release,
+        )
+        self.lifecycle.register("snapshot", self.snapshots.drop, self.snapshots.session_bytes)
+        self.lifecycle.register("file_tree", self.file_trees.drop, self.file_trees.session_bytes)
+        self.lifecycle.register("history", self._drop_history, self._history_bytes)
+        self.lifecycle.register("prompt_layout", self.prompt_layout.drop)
+        self.lifecycle.register("plan_stream", self._drop_plan_stream)
+        self.lifecycle.register("capabilities", self._drop_capabilities)
+        self.lifecycle.register("session", self.sessions.forget)
+        self.response_cache = ResponseCache(
+            max_entries=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL
+        )
+
+    async def init(self, session_id: str, capabilities: list[str] | None = None) -> bool:
+        if PLAN_DELTA in (capabilities or []):
+            self.plan_delta_sessions.add(session_id)
+        else:
+            self.plan_delta_sessions.discard(session_id)
+        if FILE_STREAM in (capabilities or []):
+            self.file_stream_sessions.add(session_id)
+        else:
+            self.file_stream_sessions.discard(session_id)
+        if MessageType.STATS.value in (capabilities or []):
+            self.stats_sessions.add(session_id)
+        else:
+            self.stats_sessions.discard(session_id)
 
-    async def init(self, session_id: str) -> bool:
         exists = await self.create_app_environment(session_id)
         return exists
 
+    def session(self, session_id: str) -> dict:
+        data = self.sessions.get(session_id)
+        if data is None:
+            raise KeyError(f"Unknown session {session_id}")
+        return data
+
+    def _sandbox_id(self, session_id: str) -> str:
+        sandbox_id = self.session(session_id)["sandbox_id"]
+        self.lifecycle.touch(session_id, sandbox_id)
+        return sandbox_id
+
     async def create_app_environment(self, session_id: str):
-        if session_id not in self.session_data:
-            self.session_data[session_id] = create_app_environment()
+        env = self.sessions.get(session_id)
+        if env is None:
+            env = await self.executor.run(Lane.PROVISION, self.sandbox_pool.acquire)
+            if self.sessions.get(session_id) is None:
+                self.sessions.put(session_id, env)
+            else:
+                # Another INIT for this session got there first
+                self.sandbox_pool.release(env)
+            keepalive.touch(self._sandbox_id(session_id))
+            print(f"Sandbox pool stats: {self.sandbox_pool.stats.to_dict()}")
             return False
 
+        keepalive.touch(env["sandbox_id"])
         return True
 
     async def load_code(self, *, session_id: str):
-        sandbox_id = self.session_data[session_id]["sandbox_id"]
-        return load_code(sandbox_id)
+        with tracer.span("load_code", session_id=session_id) as span:
+            snapshot = self.snapshots.get(session_id)
+            span.set(snapshot_hit=snapshot.is_valid())
+            if snapshot.is_valid():
+                keepalive.touch(self._sandbox_id(session_id))
+                self.snapshots.record_hit(snapshot.size())
+                print(f"Code snapshot hit for {session_id}: {self.snapshots.stats.to_dict()}")
+                return snapshot.code_map(), snapshot.package_json
+
+            self.snapshots.record_miss()
+            sandbox_id = self._sandbox_id(session_id)
+            file_map, package_json = await self.executor.run(
+                Lane.BULK, load_code, sandbox_id, executor=self.executor
+            )
+            snapshot.load(file_map, package_json)
+            return snapshot.code_map(), package_json
 
     async def edit_code(self, *, session_id: str, code_map: dict):
-        sandbox_id = self.session_data[session_id]["sandbox_id"]
-        return edit_code(sandbox_id, code_map)
+        snapshot = self.snapshots.get(session_id)
 
-    async def add_to_history(self, user_feedback: str, agent_plan: str):
-        self.history.append(
-            {
-                "role": "user",
-                "content": user_feedback,
-            }
-        )
+        # Skip files whose content matches what the sandbox already has, each
+        # write would otherwise trigger a Vite HMR reload for nothing
+        changed, skipped, rejected = {}, [], []
+        for path, content in code_map.items():
+            entry = snapshot.get(path)
+            if entry is not None and entry.hash == content_hash(content):
+                skipped.append(path)
+            elif isinstance(content, str) and content.strip() == OMITTED:
+                # The model echoed a file it was only shown as a placeholder,
+                # writing it would wipe the real contents
+                print(f"Refusing to overwrite {path} with the omitted-contents placeholder")
+                rejected.append(path)
+            else:
+                changed[path] = content
+
+        if skipped:
+            print(f"Skipping {len(skipped)} unchanged files")
+
+        sandbox_id = self._sandbox_id(session_id)
+        with tracer.span("edit_code", files=len(changed), skipped=len(skipped)):
+            if changed:
+                result = await self.executor.run(Lane.BULK, edit_code, sandbox_id, changed)
+            else:
+                result = {"sandbox_id": sandbox_id, "updated": [], "failed": []}
+
+        for path in result["updated"]:
+            content = code_map[path]
+            snapshot.put(path, content)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            self.file_trees.add_file(session_id, path, len(content))
+        if result["failed"]:
+            snapshot.mark_diverged()
+            self.file_trees.invalidate(session_id)
+
+        result["skipped"] = skipped
+        result["rejected"] = rejected
+        return result
+
+    def _history(self, session_id: str) -> SessionHistory:
+        if session_id not in self.histories:
+            self.histories[session_id] = SessionHistory(token_budget=HISTORY_TOKEN_BUDGET)
+        return self.histories[session_id]
+
+    async def add_to_history(self, session_id: str, user_feedback: str, agent_plan: str):
+        self._history(session_id).add_exchange(user_feedback, agent_plan)
+
+    def _drop_history(self, session_id: str) -> None:
+        self.histories.pop(session_id, None)
+
+    def _history_bytes(self, session_id: str) -> int:
+        history = self.histories.get(session_id)
+        return history.size_bytes() if history is not None else 0
+
+    def _drop_plan_stream(self, session_id: str) -> None:
+        self.plan_streams.pop(session_id, None)
+
+    def _drop_capabilities(self, session_id: str) -> None:
+        # Evicted with the rest of the session's state so the sets can't grow
+        # without bound; they are negotiated again at the client's next INIT
+        self.plan_delta_sessions.discard(session_id)
+        self.file_stream_sessions.discard(session_id)
+        self.stats_sessions.discard(session_id)
+
+    def resync(self, *, session_id: str, msg_id: str) -> dict:
+        """Full plan text so far, for a delta client that detected a gap"""
+        stream_id, encoder = self.plan_streams.get(session_id, (None, None))
+        if stream_id != msg_id:
+            return Message.new(
+                MessageType.ERROR,
+                {"text": f"Nothing to resync for message {msg_id}"},
+                session_id=session_id,
+            ).to_dict()
 
-        self.history.append(
-            {
-                "role": "assistant",
-                "content": agent_plan,
-            }
-        )
+        return Message.new(
+            MessageType.AGENT_PARTIAL, encoder.resync(), id=msg_id, session_id=session_id
+        ).to_dict()
 
-    def get_history(self):
-        return [
-            ConvoMessage(role=msg["role"], content=msg["content"])
-            for msg in self.history
-        ]
+    def get_history(self, session_id: str) -> list[ConvoMessage]:
+        return self._history(session_id).messages()
 
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language from file extension"""
@@ -135,51 +328,26 @@ class Agent:
         ext = os.path.splitext(file_path)[1]
         return ext_map.get(ext, "plaintext")
 
-    def _build_file_tree(self, sandbox, path: str) -> list[dict]:
-        """Recursively build file tree structure"""
-        try:
-            files = sandbox.fs.list_files(path)
-            tree = []
-            
-            for file in files:
-                # Skip node_modules and .git directories
-                if file.name in ["node_modules", ".git", "dist", "build"]:
-                    continue
-                    
-                full_path = f"{path}/{file.name}" if not path.endswith('/') else f"{path}{file.name}"
-                
-                node = {
-                    "name": file.name,
-                    "path": full_path,
-                    "is_dir": file.is_dir,
-                    "size": file.size if not file.is_dir else None,
-                    "type": "folder" if file.is_dir else "file"
-                }
-                
-                if file.is_dir:
-                    # Recursively get subdirectory contents
-                    node["children"] = self._build_file_tree(sandbox, full_path)
-                else:
-                    node["language"] = self._detect_language(file.name)
-                
-                tree.append(node)
-            
-            # Sort: directories first, then files alphabetically
-            tree.sort(key=lambda x: (not x["is_dir"], x["name"].lower()))
-            return tree
-            
-        except Exception as e:
-            print(f"Error building file tree for {path}: {e}")
-            return []
+    def _read_file_tree(self, sandbox_id: str) -> list[dict]:
+        with (
+            tracer.span("sandbox.file_tree", sandbox_id=sandbox_id),
+            sandbox_handles.handle(sandbox_id) as sandbox,
+        ):
+            keepalive.touch(sandbox_id)
+            return build_file_tree(sandbox, DEFAULT_CODE_PATH)
 
     async def get_file_tree(self, *, session_id: str):
         """Get the file tree structure from sandbox"""
         try:
-            sandbox_id = self.session_data[session_id]["sandbox_id"]
-            sandbox = Sandbox().connect(sandbox_id)
-            sandbox.update_ttl(300)
-            
-            tree = self._build_file_tree(sandbox, DEFAULT_CODE_PATH)
+            with tracer.span("get_file_tree", session_id=session_id) as span:
+                sandbox_id = self._sandbox_id(session_id)
+                tree = self.file_trees.get(session_id)
+                span.set(cached=tree is not None)
+                if tree is None:
+                    tree = await self.executor.run(Lane.BULK, self._read_file_tree, sandbox_id)
+                    self.file_trees.put(session_id, tree)
+                else:
+                    keepalive.touch(sandbox_id)
             
             return Message.new(
                 MessageType.FILE_TREE,
@@ -198,22 +366,47 @@ class Agent:
                 session_id=session_id,
             ).to_dict()
 
-    async def get_file_content(self, *, session_id: str, file_path: str):
-        """Get content of a specific file"""
-        try:
-            sandbox_id = self.session_data[session_id]["sandbox_id"]
-            sandbox = Sandbox().connect(sandbox_id)
-            sandbox.update_ttl(300)
-            
+    def _download_file(self, sandbox_id: str, file_path: str) -> str:
+        with (
+            tracer.span("sandbox.download_file", sandbox_id=sandbox_id),
+            sandbox_handles.handle(sandbox_id) as sandbox,
+        ):
+            keepalive.touch(sandbox_id)
+        
             # Download file to temp location
             with tempfile.NamedTemporaryFile(delete=False) as tmp:
                 sandbox.fs.download_file(file_path, tmp.name)
-                
+            
                 with open(tmp.name, 'r', encoding='utf-8') as f:
                     content = f.read()
-                
+            
                 # Clean up temp file
                 os.unlink(tmp.name)
+
+            tracer.add("bytes_in", len(content.encode("utf-8")))
+
+        return content
+
+    async def get_file_content(self, *, session_id: str, file_path: str):
+        """Get content of a specific file"""
+        try:
+            with tracer.span("get_file_content", session_id=session_id) as span:
+                snapshot = self.snapshots.get(session_id)
+                entry = snapshot.get(file_path)
+                span.set(snapshot_hit=entry is not None)
+                if entry is not None:
+                    keepalive.touch(self._sandbox_id(session_id))
+                    self.snapshots.record_hit(len(entry.content))
+                    content = entry.content
+                else:
+                    self.snapshots.record_miss()
+                    sandbox_id = self._sandbox_id(session_id)
+                    content = await self.executor.run(
+                        Lane.INTERACTIVE, self._download_file, sandbox_id, file_path
+                    )
+
+                    if not snapshot.diverged:
+                        snapshot.put(file_path, content)
             
             return Message.new(
                 MessageType.FILE_CONTENT,
@@ -233,18 +426,15 @@ class Agent:
                 session_id=session_id,
             ).to_dict()
 
-    async def save_file(self, *, session_id: str, file_path: str, content: str):
-        """Save edited file back to sandbox"""
-        try:
-            sandbox_id = self.session_data[session_id]["sandbox_id"]
-            sandbox = Sandbox().connect(sandbox_id)
-            sandbox.update_ttl(300)
-            
+    def _upload_file(self, sandbox_id: str, file_path: str, content: str) -> None:
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
+        
             # Write content to temp file
             with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
                 tmp.write(content)
                 tmp.flush()
-                
+            
                 # Ensure parent directory exists
                 parent_dir = str(Path(file_path).parent)
                 try:
@@ -252,12 +442,23 @@ class Agent:
                 except Exception:
                     print(f"Creating parent directory: {parent_dir}")
                     sandbox.process.exec("mkdir", "-p", parent_dir).wait()
-                
+            
                 # Upload file to sandbox
                 sandbox.fs.upload_file(tmp.name, file_path)
-                
+            
                 # Clean up temp file
                 os.unlink(tmp.name)
+
+    async def save_file(self, *, session_id: str, file_path: str, content: str):
+        """Save edited file back to sandbox"""
+        try:
+            sandbox_id = self._sandbox_id(session_id)
+            await self.executor.run(
+                Lane.INTERACTIVE, self._upload_file, sandbox_id, file_path, content
+            )
+
+            self.snapshots.get(session_id).put(file_path, content)
+            self.file_trees.add_file(session_id, file_path, len(content.encode("utf-8")))
             
             return Message.new(
                 MessageType.FILE_SAVED,
@@ -270,72 +471,374 @@ class Agent:
             
         except Exception as e:
             print(f"Error saving file {file_path}: {e}")
+            self.snapshots.get(session_id).mark_diverged()
+            self.file_trees.invalidate(session_id)
             return Message.new(
                 MessageType.ERROR,
                 {"text": f"Failed to save file: {str(e)}"},
                 session_id=session_id,
             ).to_dict()
 
-    async def send_feedback(self, *, session_id: str, feedback: str):
-        yield Message.new(MessageType.UPDATE_IN_PROGRESS, {}).to_dict()
+    async def _apply_file(
+        self, session_id: str, path: str, content: str, after: asyncio.Task | None = None
+    ) -> dict:
+        if after is not None:
+            # An earlier version of this file is still being written; let it
+            # land first so the newer content isn't overwritten by it
+            await asyncio.wait({after})
+        try:
+            return await self.edit_code(session_id=session_id, code_map={path: content})
+        except Exception as e:
+            print(f"Error applying {path}: {e}")
+            self.snapshots.get(session_id).mark_diverged()
+            self.file_trees.invalidate(session_id)
+            return {"updated": [], "failed": [path], "skipped": [], "rejected": []}
+
+    def _file_applied(self, session_id: str, msg_id: str, applied: dict, result: dict) -> dict:
+        """Fold a single-file edit_code result into result and acknowledge it."""
+        for key in ("updated", "failed", "skipped", "rejected"):
+            result[key] += applied[key]
+
+        if applied["updated"]:
+            path, status, text = applied["updated"][0], "written", "Updated"
+        elif applied["skipped"]:
+            path, status, text = applied["skipped"][0], "skipped", "Unchanged"
+        elif applied["rejected"]:
+            path, status, text = applied["rejected"][0], "rejected", "Kept existing"
+        else:
+            path, status, text = applied["failed"][0], "failed", "Failed to update"
+
+        return Message.new(
+            MessageType.UPDATE_FILE,
+            {"text": f"{text} {path}", "path": path, "status": status},
+            id=msg_id,
+            session_id=session_id,
+        ).to_dict()
 
-        code_map, package_json = await self.load_code(session_id=session_id)
+    def _stream_edit_code(
+        self, session_id: str, feedback: str, code_map: dict, package_json: str
+    ):
+        selection = self.context_selector.select(
+            code_map, feedback, self._history(session_id).recent(4)
+        )
+        print(
+            f"Context: kept {len(selection.kept)} files (~{selection.kept_tokens} tokens), "
+            f"dropped {len(selection.dropped)} files (~{selection.dropped_tokens} tokens)"
+        )
 
-        code_files = []
-        for path, content in code_map.items():
-            code_files.append({"path": path, "content": str(content)})
+        # Keep the code listing stable between turns so it is served from
+        # Anthropic's prompt cache, with recent changes sent after it
+        prompt = self.prompt_layout.split(
+            session_id, code_map, selection.code_files, package_json
+        )
+        collector = Collector(name="EditCode")
+
+        history = self.get_history(session_id)
+        if self.edit_format != "blocks":
+            stream = self.model_client.stream.EditCode(
+                history,
+                feedback,
+                prompt.code_files,
+                package_json,
+                prompt.changed_files,
+                baml_options={"collector": collector},
+            )
+            return stream, prompt, collector
+
+        def regenerate(paths: list[str]):
+            # The listing may have these files omitted or stale, so the model
+            # gets what is actually in the sandbox to rewrite
+            current = [{"path": p, "content": code_map[p]} for p in paths if p in code_map]
+            changed_files = [f for f in prompt.changed_files if f["path"] not in paths]
+            return self.model_client.stream.EditCode(
+                history,
+                f"{feedback}\n\nYour edits to these files could not be applied, "
+                f"return their complete updated contents: {', '.join(paths)}",
+                prompt.code_files,
+                package_json,
+                changed_files + current,
+                baml_options={"collector": collector},
+            )
 
-        history = self.get_history()
-        stream = self.model_client.stream.EditCode(
-            history, feedback, code_files, package_json
+        edits = self.model_client.stream.EditCodeBlocks(
+            history,
+            feedback,
+            prompt.code_files,
+            package_json,
+            prompt.changed_files,
+            baml_options={"collector": collector},
+        )
+        stream = apply_edit_stream(edits, code_map, regenerate, self.edit_stats)
+        return stream, prompt, collector
+
+    def _file_delta(
+        self, encoders: dict[str, DeltaEncoder], path: str, content: str, complete: bool
+    ) -> dict | None:
+        """FILE_DELTA data for a file's content so far, or None if there's nothing new to send"""
+        encoder = encoders.get(path)
+        if encoder is None:
+            encoder = encoders[path] = DeltaEncoder(delta=True, min_chars=FILE_DELTA_CHARS)
+        elif encoder.text == content and (encoder.done or not complete):
+            return None
+
+        data = encoder.encode(content, flush=complete)
+        if data is None:
+            if not complete:
+                return None
+            data = {"delta": "", "offset": len(content)}
+
+        encoder.done = complete
+        data["path"] = path
+        data["done"] = complete
+        if data["offset"] == 0:
+            data["language"] = self._detect_language(path)
+        return data
+
+    def _record_usage(self, session_id: str, prompt, collector: Collector):
+        usage = turn_usage(collector)
+        self.prompt_layout.record(usage)
+        print(
+            f"EditCode usage for {session_id} "
+            f"({'new' if prompt.refolded else 'cached'} listing, "
+            f"{len(prompt.changed_files)} changed files): {usage.to_dict()}"
         )
-        sent_plan = False
+        print(f"Prompt cache stats: {self.prompt_layout.stats.to_dict()}")
+        if self.edit_format == "blocks":
+            print(f"Edit block stats: {self.edit_stats.to_dict()}")
+        return usage
+
+    def _record_throughput(self, generation, usage, output_text: str) -> None:
+        """Token counts and tokens/s on the generate span, estimated when there's no usage"""
+        if usage is not None and usage.output_tokens:
+            output_tokens = usage.output_tokens
+            generation.set(
+                **{
+                    key: value
+                    for key, value in usage.to_dict().items()
+                    if key.endswith("_tokens") and value is not None
+                }
+            )
+        else:
+            output_tokens = estimate_tokens(output_text)
+            generation.set(output_tokens=output_tokens, output_tokens_estimated=True)
 
-        new_code_map = {}
-        plan_msg_id = str(uuid.uuid4())
-        file_msg_id = str(uuid.uuid4())
+        streaming_ms = generation.duration_ms - generation.attributes.get("ttft_ms", 0.0)
+        if streaming_ms > 0:
+            generation.set(tokens_per_second=round(output_tokens / streaming_ms * 1000, 1))
 
-        for partial in stream:
-            if partial.plan.state != "Complete" and not sent_plan:
-                yield Message.new(
-                    MessageType.AGENT_PARTIAL,
-                    {"text": partial.plan.value},
-                    id=plan_msg_id,
-                    session_id=session_id,
-                ).to_dict()
+    def service_stats(self) -> dict:
+        """Counters for the caches and pools shared by every session on this replica"""
+        return {
+            "sandbox_handles": sandbox_handles.stats.to_dict(),
+            "executor": self.executor.to_dict(),
+            "file_trees": self.file_trees.stats.to_dict(),
+            "session_store": self.sessions.stats.to_dict(),
+            "lifecycle": self.lifecycle.to_dict(),
+        }
+
+    def _response_key(self, session_id: str, feedback: str) -> str:
+        code_hash = self.snapshots.get(session_id).state_hash()
+        return response_key(code_hash, self.get_history(session_id), feedback)
 
-            if partial.plan.state == "Complete" and not sent_plan:
+    async def send_feedback(self, *, session_id: str, feedback: str):
+        # Generations can go quiet for a while, keep the session from being evicted meanwhile
+        with self.lifecycle.active(session_id):
+            queue = OutboundQueue(
+                max_depth=OUTBOUND_QUEUE_DEPTH,
+                coalesce=(MessageType.AGENT_PARTIAL.value, MessageType.FILE_DELTA.value),
+                stats=self.outbound_stats,
+            )
+            messages = self._traced_send_feedback(session_id=session_id, feedback=feedback)
+            async for message in queue.stream(messages):
+                yield message
+
+        print(f"Outbound queue stats: {self.outbound_stats.to_dict()}")
+
+    async def _traced_send_feedback(self, *, session_id: str, feedback: str):
+        # Runs in the outbound queue's producer task, so every stage below
+        # (and the tasks and executor calls it starts) nests under this span
+        with tracer.span(
+            "send_feedback", session_id=session_id, edit_format=self.edit_format
+        ) as span:
+            async for message in self._send_feedback(session_id=session_id, feedback=feedback):
+                yield message
+
+            stats = tracer.summary(span)
+            print(f"send_feedback trace for {session_id}: {stats}")
+            service = self.service_stats()
+            print(f"Service stats: {service}")
+            if session_id in self.stats_sessions:
                 yield Message.new(
-                    MessageType.AGENT_FINAL,
-                    {"text": partial.plan.value},
-                    id=plan_msg_id,
-                    session_id=session_id,
+                    MessageType.STATS, {**stats, "service": service}, session_id=session_id
                 ).to_dict()
 
-                await self.add_to_history(feedback, partial.plan.value)
+    async def _send_feedback(self, *, session_id: str, feedback: str):
+        yield Message.new(MessageType.UPDATE_IN_PROGRESS, {}).to_dict()
+
+        code_map, package_json = await self.load_code(session_id=session_id)
 
-                sent_plan = True
+        # Identical feedback on identical code and history (a double-click
+        # while the first is still generating) replays that response instead
+        # of paying for another generation
+        cache_key = self._response_key(session_id, feedback)
+        cached = await self.response_cache.get(cache_key)
+        prompt, collector = None, None
 
-            for file in partial.files:
-                if file.path not in new_code_map:
+        generation = tracer.start("generate", cached=cached is not None)
+        output_text = ""
+        response = None
+        try:
+            if cached is not None:
+                print(f"Response cache hit for {session_id}: {self.response_cache.stats.to_dict()}")
+                stream = replay(cached)
+            else:
+                # Registered inside the try so a failure anywhere after this
+                # resolves the future for requests waiting on it
+                self.response_cache.begin(cache_key)
+                stream, prompt, collector = self._stream_edit_code(
+                    session_id, feedback, code_map, package_json
+                )
+
+            sent_plan = False
+            plan = ""
+            new_package_json = None
+
+            new_code_map = {}
+            plan_msg_id = str(uuid.uuid4())
+            file_msg_id = str(uuid.uuid4())
+
+            encoder = DeltaEncoder(delta=session_id in self.plan_delta_sessions)
+            self.plan_streams[session_id] = (plan_msg_id, encoder)
+
+            # File contents stream in as they are generated; a client that
+            # asked for file_stream gets them as FILE_DELTA messages and has
+            # every generated file without fetching it back from the sandbox
+            stream_files = session_id in self.file_stream_sessions
+            file_encoders: dict[str, DeltaEncoder] = {}
+
+            # With incremental apply each file is written as soon as its
+            # content is complete in the stream, overlapping the uploads with
+            # the rest of the generation
+            applying: set[asyncio.Task] = set()
+            last_write: dict[str, asyncio.Task] = {}
+            result = {"updated": [], "failed": [], "skipped": [], "rejected": []}
+
+            async for partial in stream:
+                if "ttft_ms" not in generation.attributes:
+                    generation.set(ttft_ms=generation.duration_ms)
+                if partial.plan.state != "Complete" and not sent_plan:
+                    data = encoder.encode(partial.plan.value or "")
+                    if data is not None:
+                        yield Message.new(
+                            MessageType.AGENT_PARTIAL,
+                            data,
+                            id=plan_msg_id,
+                            session_id=session_id,
+                        ).to_dict()
+
+                if partial.plan.state == "Complete" and not sent_plan:
+                    plan = partial.plan.value
+                    encoder.text = plan
                     yield Message.new(
-                        MessageType.UPDATE_FILE,
-                        {"text": f"Working on {file.path}"},
-                        id=file_msg_id,
+                        MessageType.AGENT_FINAL,
+                        {"text": plan},
+                        id=plan_msg_id,
                         session_id=session_id,
                     ).to_dict()
 
-                    new_code_map[file.path] = file.content
+                    # A replay is the same exchange the original already recorded
+                    if cached is None:
+                        await self.add_to_history(session_id, feedback, plan)
+
+                    sent_plan = True
+
+                for file in partial.files:
+                    if file.path is None:
+                        continue
+                    content = file.content.value or ""
+                    complete = file.content.state == "Complete"
+
+                    if stream_files:
+                        data = self._file_delta(file_encoders, file.path, content, complete)
+                        if data is not None:
+                            yield Message.new(
+                                MessageType.FILE_DELTA,
+                                data,
+                                id=file_msg_id,
+                                session_id=session_id,
+                            ).to_dict()
+
+                    if complete and new_code_map.get(file.path) != content:
+                        yield Message.new(
+                            MessageType.UPDATE_FILE,
+                            {"text": f"Working on {file.path}"},
+                            id=file_msg_id,
+                            session_id=session_id,
+                        ).to_dict()
+
+                        new_code_map[file.path] = content
+
+                        if self.incremental_apply:
+                            task = asyncio.create_task(
+                                self._apply_file(
+                                    session_id, file.path, content, last_write.get(file.path)
+                                )
+                            )
+                            last_write[file.path] = task
+                            applying.add(task)
+
+                new_package_json = partial.package_json or new_package_json
+
+                for task in [t for t in applying if t.done()]:
+                    applying.discard(task)
+                    yield self._file_applied(session_id, file_msg_id, task.result(), result)
+
+            tracer.end(generation)
+            output_text = plan + "".join(new_code_map.values())
+
+            response = cached or CachedResponse(
+                plan=plan,
+                files=new_code_map,
+                package_json=new_package_json,
+                created_at=time.time(),
+            )
+
+            if self.incremental_apply:
+                for next_done in asyncio.as_completed(applying):
+                    applied = await next_done
+                    yield self._file_applied(session_id, file_msg_id, applied, result)
+            else:
+                result = await self.edit_code(session_id=session_id, code_map=new_code_map)
+        finally:
+            tracer.end(generation)
+            if cached is None:
+                self.response_cache.finish(cache_key, response)
 
-        await self.edit_code(session_id=session_id, code_map=new_code_map)
+        usage = self._record_usage(session_id, prompt, collector) if collector else None
+        self._record_throughput(generation, usage, output_text)
 
         yield Message.new(
-            MessageType.UPDATE_COMPLETED, {}, session_id=session_id
+            MessageType.UPDATE_COMPLETED,
+            {
+                "text": (
+                    f"Wrote {len(result['updated'])} files, "
+                    f"skipped {len(result['skipped'])} unchanged"
+                ),
+                "written": len(result["updated"]),
+                "skipped": len(result["skipped"]),
+                "updated": result["updated"],
+                "failed": result["failed"],
+                "rejected": result["rejected"],
+                "cached": cached is not None,
+            },
+            session_id=session_id,
         ).to_dict()
 
 
 async def _load_agent():
     agent = Agent()
+    agent.sandbox_pool.start()
+    keepalive.start()
     print("Loaded agent")
     return agent
 
@@ -350,10 +853,11 @@ async def _load_agent():
     ),
     secrets=["OPENAI_API_KEY", "ANTHROPIC_API_KEY"],
     concurrent_requests=1000,
-    keep_warm_seconds=300,
+    keep_warm_seconds=KEEP_WARM_SECONDS,
 )
 async def handler(event, context):
     agent: Agent = context.on_start_value
+    agent.lifecycle.maybe_sweep()
     msg = json.loads(event)
 
     match msg.get("type"):
@@ -367,10 +871,15 @@ async def handler(event, context):
             
         case MessageType.INIT.value:
             session_id = msg["data"]["session_id"]
-            exists = await agent.init(session_id=session_id)
+            exists = await agent.init(
+                session_id=session_id, capabilities=msg["data"].get("capabilities")
+            )
 
-            data = agent.session_data[session_id]
+            data = agent.session(session_id)
             data["exists"] = exists
+            data[PLAN_DELTA] = session_id in agent.plan_delta_sessions
+            data[FILE_STREAM] = session_id in agent.file_stream_sessions
+            data[MessageType.STATS.value] = session_id in agent.stats_sessions
 
             return Message.new(
                 MessageType.INIT,
@@ -408,6 +917,10 @@ async def handler(event, context):
                 file_path=file_path,
                 content=content
             )
+
+        case MessageType.RESYNC.value:
+            session_id = msg["data"]["session_id"]
+            return agent.resync(session_id=session_id, msg_id=msg["data"]["id"])
             
         case _:
             return {}
\ No newline at end of file
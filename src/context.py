@@ -0,0 +1,148 @@
+import posixpath
+import re
+from collections import deque
+from dataclasses import dataclass, field
+
+from .tools import DEFAULT_CODE_PATH
+
+IMPORT_RE = re.compile(
+    r"""(?:import|export)\s[^'";]*?from\s*['"]([^'"]+)['"]"""
+    r"""|import\s*['"]([^'"]+)['"]"""
+    r"""|import\(\s*['"]([^'"]+)['"]\s*\)"""
+)
+WORD_RE = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+")
+RESOLVE_EXTENSIONS = [".tsx", ".ts", ".jsx", ".js", ".css", ".json"]
+ENTRY_POINTS = [f"{DEFAULT_CODE_PATH}/App.tsx", f"{DEFAULT_CODE_PATH}/main.tsx"]
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "make", "add", "use", "can",
+    "you", "please", "want", "should", "from", "into", "are", "not", "all",
+    "tsx", "jsx", "src", "app", "index", "components",
+}
+OMITTED = "// Contents omitted from this prompt to save context. The file exists and is unchanged."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token for code"""
+    return len(text) // 4 + 1
+
+
+def _words(text: str) -> set[str]:
+    words = {w.lower() for w in WORD_RE.findall(text)}
+    return {w for w in words if len(w) > 2 and w not in STOPWORDS}
+
+
+def parse_imports(content: str) -> list[str]:
+    return [next(g for g in match if g) for match in IMPORT_RE.findall(content)]
+
+
+def resolve_import(spec: str, importer: str, paths: set[str]) -> str | None:
+    """Resolve a relative or @/ import to a path in the project, if it is one"""
+    if spec.startswith("@/"):
+        base = f"{DEFAULT_CODE_PATH}/{spec[2:]}"
+    elif spec.startswith("."):
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+    else:
+        return None
+
+    candidates = [base]
+    candidates += [base + ext for ext in RESOLVE_EXTENSIONS]
+    candidates += [f"{base}/index{ext}" for ext in RESOLVE_EXTENSIONS]
+    return next((c for c in candidates if c in paths), None)
+
+
+def import_distances(code_map: dict[str, str]) -> dict[str, int]:
+    """Breadth-first import depth of every file reachable from the entry points"""
+    paths = set(code_map)
+    distances = {entry: 0 for entry in ENTRY_POINTS if entry in paths}
+    queue = deque(distances)
+
+    while queue:
+        path = queue.popleft()
+        for spec in parse_imports(code_map[path]):
+            target = resolve_import(spec, path, paths)
+            if target is not None and target not in distances:
+                distances[target] = distances[path] + 1
+                queue.append(target)
+
+    return distances
+
+
+@dataclass
+class ContextSelection:
+    code_files: list[dict]
+    kept: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    kept_tokens: int = 0
+    dropped_tokens: int = 0
+
+
+class ContextSelector:
+    """
+    Chooses which files go into the EditCode prompt in full. Files are ranked
+    by how close they are to App.tsx in the import graph and how well their
+    path and content match the feedback and recent history, then added until
+    the token budget is used up. Files that don't fit are still listed, with
+    their contents replaced by a one-line note, so the model knows they exist.
+    """
+
+    def __init__(self, token_budget: int = 24_000):
+        self.token_budget = token_budget
+
+    def score(self, path: str, content: str, depth: int | None, terms: set[str]) -> float:
+        score = 0.0
+        if depth is not None:
+            score += 1.0 / (1 + depth)
+        if "/components/ui/" in path:
+            # shadcn primitives are large and rarely what the feedback is about
+            score -= 0.5
+
+        name_terms = _words(posixpath.relpath(path, DEFAULT_CODE_PATH))
+        score += 2.0 * len(name_terms & terms)
+
+        if terms:
+            content_terms = _words(content[:20_000])
+            score += len(content_terms & terms) / len(terms)
+
+        return score
+
+    def select(
+        self, code_map: dict[str, str], feedback: str, history: list[str] | None = None
+    ) -> ContextSelection:
+        terms = _words(feedback) | _words(" ".join(history or []))
+        distances = import_distances(code_map)
+
+        # Entry points and anything named in the feedback always go in
+        lowered = feedback.lower()
+        pinned = {p for p in ENTRY_POINTS if p in code_map}
+        pinned |= {p for p in code_map if posixpath.basename(p).lower() in lowered}
+
+        ranked = sorted(
+            code_map,
+            key=lambda p: (
+                p not in pinned,
+                -self.score(p, code_map[p], distances.get(p), terms),
+                p,
+            ),
+        )
+
+        selection = ContextSelection(code_files=[])
+        budget = self.token_budget
+        keep = set()
+        for path in ranked:
+            tokens = estimate_tokens(code_map[path])
+            if path in pinned or tokens <= budget:
+                keep.add(path)
+                budget -= tokens
+                selection.kept_tokens += tokens
+            else:
+                selection.dropped_tokens += tokens
+
+        for path, content in code_map.items():
+            if path in keep:
+                selection.kept.append(path)
+                selection.code_files.append({"path": path, "content": content})
+            else:
+                selection.dropped.append(path)
+                selection.code_files.append({"path": path, "content": OMITTED})
+
+        return selection
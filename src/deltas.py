@@ -0,0 +1,42 @@
+PLAN_DELTA = "plan_delta"
+FILE_STREAM = "file_stream"
+
+
+class DeltaEncoder:
+    """
+    Encodes a growing text (the plan, or a file being generated) for streaming.
+    Without deltas every message carries the full text so far. With deltas a
+    message carries only what was appended and the offset it starts at, so a
+    client that missed a message can tell and ask for a resync; if the text was
+    revised rather than extended the full text is sent again.
+
+    min_chars holds back appends smaller than that until flushed, so a file
+    generated a few characters per partial isn't sent as thousands of messages.
+    done records whether the client has been told the current text is final.
+    """
+
+    def __init__(self, delta: bool, min_chars: int = 0):
+        self.delta = delta
+        self.min_chars = min_chars
+        self.text = ""
+        self.done = False
+
+    def encode(self, text: str, flush: bool = False) -> dict | None:
+        """Message data for the text so far, or None if there is nothing to send yet"""
+        if not self.delta:
+            self.text = text
+            return {"text": text}
+
+        if text.startswith(self.text):
+            appended = text[len(self.text) :]
+            if not appended or (len(appended) < self.min_chars and not flush):
+                return None
+            data = {"delta": appended, "offset": len(self.text)}
+        else:
+            data = {"text": text, "offset": 0}
+
+        self.text = text
+        return data
+
+    def resync(self) -> dict:
+        return {"text": self.text, "offset": 0}
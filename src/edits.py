@@ -0,0 +1,201 @@
+from dataclasses import dataclass, field
+
+from baml_client import partial_types
+from baml_client.types import EditBlock
+
+
+class EditError(Exception):
+    pass
+
+
+def generated_file(path: str, content: str) -> partial_types.GeneratedFile:
+    """A finished file as it appears in a CodeChanges partial"""
+    return partial_types.GeneratedFile(
+        path=path, content=partial_types.StreamState(value=content, state="Complete")
+    )
+
+
+def _indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _trim_blank(lines: list[str]) -> list[str]:
+    start, end = 0, len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return lines[start:end]
+
+
+def _find_lines(lines: list[str], search: list[str]) -> int:
+    """Index of the only run of lines matching search, ignoring whitespace"""
+    wanted = [line.strip() for line in search]
+    stripped = [line.strip() for line in lines]
+    matches = [
+        i
+        for i in range(len(lines) - len(wanted) + 1)
+        if stripped[i : i + len(wanted)] == wanted
+    ]
+    if not matches:
+        raise EditError("search block not found")
+    if len(matches) > 1:
+        raise EditError(f"search block matches {len(matches)} places")
+    return matches[0]
+
+
+def apply_edit(content: str, search: str, replace: str) -> str:
+    """
+    Replace the one occurrence of search in content. An exact match is tried
+    first; failing that, lines are compared with surrounding whitespace
+    ignored and the replacement is re-indented by however much the search
+    block's indentation was off.
+    """
+    if not search.strip():
+        raise EditError("empty search block")
+
+    count = content.count(search)
+    if count == 1:
+        return content.replace(search, replace, 1)
+    if count > 1:
+        raise EditError(f"search block matches {count} places")
+
+    lines = content.splitlines(keepends=True)
+    search_lines = _trim_blank(search.splitlines())
+    start = _find_lines(lines, search_lines)
+    matched = lines[start : start + len(search_lines)]
+
+    # Shift the replacement by the indentation difference on the first line
+    actual, expected = _indent(matched[0]), _indent(search_lines[0])
+    replaced = []
+    for line in _trim_blank(replace.splitlines()):
+        if line.strip() and line.startswith(expected):
+            line = actual + line[len(expected) :]
+        replaced.append(line + "\n")
+
+    if replaced and not matched[-1].endswith("\n"):
+        replaced[-1] = replaced[-1].rstrip("\n")
+    return "".join(lines[:start] + replaced + lines[start + len(search_lines) :])
+
+
+@dataclass
+class EditStats:
+    blocks: int = 0
+    fuzzy: int = 0
+    failed_blocks: int = 0
+    regenerated_files: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "blocks": self.blocks,
+            "fuzzy": self.fuzzy,
+            "failed_blocks": self.failed_blocks,
+            "regenerated_files": self.regenerated_files,
+        }
+
+
+@dataclass
+class EditSession:
+    """Applies the edit blocks of one response to the current code, in memory"""
+
+    code_map: dict[str, str]
+    stats: EditStats = field(default_factory=EditStats)
+    patched: dict[str, str] = field(default_factory=dict)
+    failed: set[str] = field(default_factory=set)
+
+    def apply(self, block: EditBlock) -> bool:
+        self.stats.blocks += 1
+        if block.path in self.failed:
+            return False
+
+        current = self.patched.get(block.path, self.code_map.get(block.path))
+        if current is None:
+            print(f"Edit for unknown file {block.path}")
+            self._fail(block.path)
+            return False
+
+        try:
+            patched = apply_edit(current, block.search, block.replace)
+        except EditError as e:
+            print(f"Edit failed for {block.path}: {e}")
+            self._fail(block.path)
+            return False
+
+        if current.count(block.search) != 1:
+            self.stats.fuzzy += 1
+        self.patched[block.path] = patched
+        return True
+
+    def _fail(self, path: str) -> None:
+        self.stats.failed_blocks += 1
+        self.failed.add(path)
+        self.patched.pop(path, None)
+
+
+async def apply_edit_stream(stream, code_map: dict[str, str], regenerate, stats: EditStats):
+    """
+    Turn a stream of CodeEdits partials into CodeChanges partials with whole
+    files, so the rest of the pipeline doesn't care which format was used.
+
+    A patched file is emitted once the model moves on to another file, or at
+    the end of the stream. Files whose blocks could not be applied are asked
+    for again in full with regenerate(paths), which returns a CodeChanges stream.
+    """
+    session = EditSession(code_map=code_map, stats=stats)
+    emitted: dict[str, str] = {}
+    whole: set[str] = set()
+    applied = 0
+    plan = None
+    package_json = None
+
+    def changes() -> partial_types.CodeChanges:
+        files = [generated_file(path, content) for path, content in emitted.items()]
+        return partial_types.CodeChanges(plan=plan, files=files, package_json=package_json)
+
+    def flush(paths) -> bool:
+        added = False
+        for path in paths:
+            content = session.patched.get(path)
+            # A file can be emitted again if the model went back to it later,
+            # consumers compare contents rather than just paths
+            if content is not None and path not in whole and emitted.get(path) != content:
+                emitted[path] = content
+                added = True
+        return added
+
+    async for partial in stream:
+        plan = partial.plan
+        package_json = partial.package_json or package_json
+
+        for block in partial.edits[applied:]:
+            # The model has moved on, so earlier files are finished
+            flush([p for p in session.patched if p != block.path])
+            session.apply(block)
+        applied = len(partial.edits)
+
+        for file in partial.files:
+            if file.path not in whole:
+                emitted[file.path] = file.content
+                whole.add(file.path)
+
+        yield changes()
+
+    if flush(list(session.patched)):
+        yield changes()
+
+    # Includes files emitted before a later block for them failed, which
+    # were written half-edited and are now replaced in full
+    failed = sorted(session.failed - whole)
+    if not failed:
+        return
+
+    print(f"Regenerating {len(failed)} files whose edits did not apply: {failed}")
+    stats.regenerated_files += len(failed)
+    async for partial in regenerate(failed):
+        for file in partial.files:
+            if file.content.state != "Complete":
+                continue
+            if file.path in failed and file.path not in whole:
+                emitted[file.path] = file.content.value or ""
+                whole.add(file.path)
+        yield changes()
@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+
+
+class Lane(Enum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    PROVISION = "provision"
+    FETCH = "fetch"
+
+
+@dataclass
+class LaneStats:
+    queued: int = 0
+    active: int = 0
+    completed: int = 0
+    failed: int = 0
+    max_queue_depth: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def to_dict(self) -> dict:
+        started = self.completed + self.failed + self.active
+        return {
+            "queue_depth": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_seconds_avg": self.wait_seconds_total / started if started else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class LaneExecutor:
+    """
+    Runs blocking sandbox I/O off the event loop. Each lane has its own thread
+    pool, so a burst of bulk work (load_code, tree rebuilds) can never queue
+    ahead of interactive requests like opening or saving a file, and creating
+    a sandbox on a pool miss, which can take minutes, holds up neither. Bulk
+    work fans its individual reads out to the fetch lane, which is shared by
+    every session so concurrent loads can't multiply the threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        interactive_workers: int = 16,
+        bulk_workers: int = 8,
+        provision_workers: int = 4,
+        fetch_workers: int = 8,
+    ):
+        self._pools = {
+            Lane.INTERACTIVE: ThreadPoolExecutor(
+                max_workers=interactive_workers, thread_name_prefix="io-interactive"
+            ),
+            Lane.BULK: ThreadPoolExecutor(
+                max_workers=bulk_workers, thread_name_prefix="io-bulk"
+            ),
+            Lane.PROVISION: ThreadPoolExecutor(
+                max_workers=provision_workers, thread_name_prefix="io-provision"
+            ),
+            Lane.FETCH: ThreadPoolExecutor(
+                max_workers=fetch_workers, thread_name_prefix="io-fetch"
+            ),
+        }
+        self.stats = {lane: LaneStats() for lane in Lane}
+        self._lock = threading.Lock()
+
+    async def run(self, lane: Lane, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the lane's pool and await the result."""
+        return await asyncio.wrap_future(self.submit(lane, fn, *args, **kwargs))
+
+    def submit(self, lane: Lane, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs) on the lane's pool, from any thread."""
+        stats = self.stats[lane]
+        with self._lock:
+            stats.queued += 1
+            stats.max_queue_depth = max(stats.max_queue_depth, stats.queued)
+
+        submitted = time.monotonic()
+
+        def _call():
+            waited = time.monotonic() - submitted
+            with self._lock:
+                stats.queued -= 1
+                stats.active += 1
+                stats.wait_seconds_total += waited
+                stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    stats.active -= 1
+                    stats.failed += 1
+                raise
+
+            with self._lock:
+                stats.active -= 1
+                stats.completed += 1
+            return result
+
+        # Carry the caller's context (the current trace span) into the worker thread
+        context = contextvars.copy_context()
+        return self._pools[lane].submit(context.run, _call)
+
+    def queue_depth(self, lane: Lane) -> int:
+        return self.stats[lane].queued
+
+    def to_dict(self) -> dict:
+        return {lane.value: stats.to_dict() for lane, stats in self.stats.items()}
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,95 @@
+import posixpath
+from dataclasses import dataclass
+
+from .tools import DEFAULT_CODE_PATH, TREE_SKIP_DIRS, _tree_node, sort_tree
+
+
+@dataclass
+class FileTreeStats:
+    hits: int = 0
+    misses: int = 0
+    patches: int = 0
+    invalidations: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "patches": self.patches,
+            "invalidations": self.invalidations,
+        }
+
+
+class FileTreeCache:
+    """
+    Per-session file trees. Writes made through the agent patch the cached
+    tree in place; anything else that may have changed the sandbox should
+    invalidate it so the next GET_FILE_TREE rebuilds it.
+    """
+
+    def __init__(self, root: str = DEFAULT_CODE_PATH):
+        self.root = root.rstrip("/")
+        self.stats = FileTreeStats()
+        self._trees: dict[str, list[dict]] = {}
+
+    def get(self, session_id: str) -> list[dict] | None:
+        tree = self._trees.get(session_id)
+        if tree is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return tree
+
+    def put(self, session_id: str, tree: list[dict]) -> None:
+        self._trees[session_id] = tree
+
+    def invalidate(self, session_id: str) -> None:
+        if self._trees.pop(session_id, None) is not None:
+            self.stats.invalidations += 1
+
+    def add_file(self, session_id: str, path: str, size: int) -> None:
+        """Insert or update a file node, creating any missing folders."""
+        tree = self._trees.get(session_id)
+        if tree is None or not path.startswith(f"{self.root}/"):
+            return
+
+        parts = posixpath.relpath(path, self.root).split("/")
+        if any(part in TREE_SKIP_DIRS for part in parts):
+            return
+
+        children, current = tree, self.root
+        for name in parts[:-1]:
+            current = f"{current}/{name}"
+            node = next((n for n in children if n["name"] == name), None)
+            if node is None:
+                node = _tree_node(name, current, True, None)
+                children.append(node)
+            elif not node["is_dir"]:
+                # A file became a folder, the cached tree can't be trusted
+                self.invalidate(session_id)
+                return
+            children = node["children"]
+
+        node = next((n for n in children if n["name"] == parts[-1]), None)
+        if node is None:
+            children.append(_tree_node(parts[-1], path, False, size))
+        elif node["is_dir"]:
+            self.invalidate(session_id)
+            return
+        else:
+            node["size"] = size
+
+        sort_tree(tree)
+        self.stats.patches += 1
+
+    def drop(self, session_id: str) -> None:
+        self._trees.pop(session_id, None)
+
+    def session_bytes(self, session_id: str) -> int:
+        """Rough size of a cached tree: its paths plus a fixed cost per node"""
+        total, stack = 0, list(self._trees.get(session_id, []))
+        while stack:
+            node = stack.pop()
+            total += len(node["path"]) + 200
+            stack.extend(node.get("children") or [])
+        return total
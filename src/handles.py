@@ -0,0 +1,148 @@
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from beam import Sandbox
+
+from .telemetry import tracer
+
+
+def _connect(sandbox_id: str):
+    return Sandbox().connect(sandbox_id)
+
+
+def _health_check(sandbox) -> None:
+    sandbox.fs.stat_file("/")
+
+
+def _is_connection_error(error: Exception) -> bool:
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return type(error).__module__.split(".")[0] in ("grpc", "grpclib")
+
+
+@dataclass
+class HandleStats:
+    connects: int = 0
+    connects_avoided: int = 0
+    reconnects: int = 0
+    health_check_failures: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "connects": self.connects,
+            "connects_avoided": self.connects_avoided,
+            "reconnects": self.reconnects,
+            "health_check_failures": self.health_check_failures,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class _Handle:
+    sandbox: object
+    last_used: float
+    last_checked: float
+
+
+class SandboxHandlePool:
+    """
+    Connected sandbox handles keyed by sandbox_id, so every operation on a
+    session reuses one connection instead of calling Sandbox().connect().
+    Handles idle for longer than health_check_seconds are checked before
+    being handed out, and dropped once idle for idle_seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        connect_fn: Callable[[str], object] = _connect,
+        health_check_fn: Callable[[object], None] = _health_check,
+        idle_seconds: float = 600.0,
+        health_check_seconds: float = 30.0,
+    ):
+        self.connect_fn = connect_fn
+        self.health_check_fn = health_check_fn
+        self.idle_seconds = idle_seconds
+        self.health_check_seconds = health_check_seconds
+        self.stats = HandleStats()
+
+        self._handles: dict[str, _Handle] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sandbox_id: str):
+        """Return a connected handle for sandbox_id, reconnecting if needed."""
+        now = time.monotonic()
+        self.evict_idle(now)
+
+        with self._lock:
+            handle = self._handles.get(sandbox_id)
+
+        if handle is not None and now - handle.last_checked > self.health_check_seconds:
+            try:
+                self.health_check_fn(handle.sandbox)
+                handle.last_checked = now
+            except Exception as e:
+                print(f"Sandbox handle {sandbox_id} failed health check: {e}")
+                self.stats.health_check_failures += 1
+                self.invalidate(sandbox_id)
+                handle = None
+
+        if handle is not None:
+            handle.last_used = now
+            self.stats.connects_avoided += 1
+            return handle.sandbox
+
+        sandbox = self.connect_fn(sandbox_id)
+        with self._lock:
+            self.stats.connects += 1
+            self._handles[sandbox_id] = _Handle(
+                sandbox=sandbox, last_used=now, last_checked=now
+            )
+        return sandbox
+
+    @contextmanager
+    def handle(self, sandbox_id: str):
+        """
+        Borrow a handle; if the body fails with a connection error the handle
+        is dropped so the next caller reconnects.
+        """
+        sandbox = self.get(sandbox_id)
+        try:
+            yield tracer.count_rpcs(sandbox)
+        except Exception as e:
+            if _is_connection_error(e):
+                print(f"Connection error on sandbox {sandbox_id}, dropping handle: {e}")
+                self.invalidate(sandbox_id)
+                self.stats.reconnects += 1
+            raise
+
+    def invalidate(self, sandbox_id: str) -> None:
+        with self._lock:
+            self._handles.pop(sandbox_id, None)
+
+    def release(self, sandbox_id: str) -> None:
+        """Forget a handle whose session has gone away."""
+        self.invalidate(sandbox_id)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            idle = [
+                sandbox_id
+                for sandbox_id, handle in self._handles.items()
+                if now - handle.last_used > self.idle_seconds
+            ]
+            for sandbox_id in idle:
+                del self._handles[sandbox_id]
+            self.stats.evictions += len(idle)
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+sandbox_handles = SandboxHandlePool()
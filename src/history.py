@@ -0,0 +1,97 @@
+import re
+from dataclasses import dataclass
+
+from baml_client.types import Message as ConvoMessage
+
+from .context import estimate_tokens
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass(slots=True)
+class Turn:
+    role: str
+    content: str
+    tokens: int
+
+
+def _first_sentence(text: str, limit: int = 240) -> str:
+    sentence = SENTENCE_RE.split(text.strip(), maxsplit=1)[0]
+    if len(sentence) > limit:
+        sentence = sentence[: limit - 3].rstrip() + "..."
+    return sentence
+
+
+class SessionHistory:
+    """
+    Conversation history for one session. Once the turns pass token_budget,
+    everything but the last keep_recent turns is folded into a short extractive
+    summary (what the user asked, what the agent planned), so the history sent
+    to EditCode stays roughly constant in size however long the session runs.
+    """
+
+    def __init__(self, token_budget: int = 4000, keep_recent: int = 6):
+        # Keep whole user/assistant pairs so roles keep alternating
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent + keep_recent % 2
+        self.summary: list[str] = []
+        self.turns: list[Turn] = []
+        self.compactions = 0
+        self._messages: list[ConvoMessage] | None = None
+
+    def add_exchange(self, user_content: str, assistant_content: str) -> None:
+        """Record one user request and the agent's plan, compacting if over budget"""
+        for role, content in (("user", user_content), ("assistant", assistant_content)):
+            self.turns.append(Turn(role=role, content=content, tokens=estimate_tokens(content)))
+        self._messages = None
+
+        if self.tokens() > self.token_budget:
+            self.compact()
+
+    def tokens(self) -> int:
+        summary_tokens = sum(estimate_tokens(line) for line in self.summary)
+        return summary_tokens + sum(turn.tokens for turn in self.turns)
+
+    def compact(self) -> None:
+        if len(self.turns) <= self.keep_recent:
+            return
+
+        old, self.turns = self.turns[: -self.keep_recent], self.turns[-self.keep_recent :]
+        for turn in old:
+            prefix = "User asked" if turn.role == "user" else "Agent planned"
+            self.summary.append(f"- {prefix}: {_first_sentence(turn.content)}")
+
+        # The summary itself is bounded to a quarter of the budget, oldest lines go first
+        while len(self.summary) > 1 and (
+            sum(estimate_tokens(line) for line in self.summary) > self.token_budget // 4
+        ):
+            self.summary.pop(0)
+
+        self.compactions += 1
+        self._messages = None
+        print(
+            f"Compacted history: {len(old)} turns summarised, "
+            f"{len(self.turns)} kept, ~{self.tokens()} tokens"
+        )
+
+    def size_bytes(self) -> int:
+        return sum(len(t.content) for t in self.turns) + sum(len(line) for line in self.summary)
+
+    def recent(self, n: int) -> list[str]:
+        return [turn.content for turn in self.turns[-n:]]
+
+    def messages(self) -> list[ConvoMessage]:
+        """History as BAML messages, with the summary folded into the first turn"""
+        if self._messages is None:
+            messages = [ConvoMessage(role=t.role, content=t.content) for t in self.turns]
+            if self.summary and messages:
+                summary = "\n".join(self.summary)
+                messages[0] = ConvoMessage(
+                    role=messages[0].role,
+                    content=(
+                        f"Summary of earlier conversation:\n{summary}\n\n"
+                        f"{messages[0].content}"
+                    ),
+                )
+            self._messages = messages
+        return self._messages
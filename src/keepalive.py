@@ -0,0 +1,143 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .handles import sandbox_handles
+
+DEFAULT_SANDBOX_TTL = 300
+
+
+def _refresh_ttl(sandbox_id: str, ttl: int) -> None:
+    with sandbox_handles.handle(sandbox_id) as sandbox:
+        sandbox.update_ttl(ttl)
+
+
+@dataclass
+class KeepaliveStats:
+    touches: int = 0
+    refreshes: int = 0
+    failures: int = 0
+    expired: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "touches": self.touches,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "expired": self.expired,
+            "rpcs_saved": max(self.touches - self.refreshes, 0),
+        }
+
+
+@dataclass
+class _Activity:
+    last_active: float
+    last_refreshed: float = 0.0
+
+
+class KeepaliveScheduler:
+    """
+    Refreshes sandbox TTLs in the background instead of on every request.
+    Request handlers only record activity with touch(); a sandbox that was
+    active since its last refresh gets at most one update_ttl per interval,
+    and one that stays idle is simply left to expire.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_fn: Callable[[str, int], None] = _refresh_ttl,
+        ttl: int = DEFAULT_SANDBOX_TTL,
+        interval: float = 60.0,
+        tick_seconds: float = 5.0,
+        max_workers: int = 8,
+    ):
+        self.refresh_fn = refresh_fn
+        self.ttl = ttl
+        self.interval = interval
+        self.tick_seconds = tick_seconds
+        self.stats = KeepaliveStats()
+
+        self._activity: dict[str, _Activity] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="keepalive"
+        )
+
+    def touch(self, sandbox_id: str) -> None:
+        """Record that a sandbox was just used."""
+        now = time.monotonic()
+        with self._lock:
+            self.stats.touches += 1
+            activity = self._activity.get(sandbox_id)
+            if activity is None:
+                self._activity[sandbox_id] = _Activity(last_active=now)
+            else:
+                activity.last_active = now
+
+    def forget(self, sandbox_id: str) -> None:
+        with self._lock:
+            self._activity.pop(sandbox_id, None)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name="keepalive", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.tick_seconds):
+            self.tick()
+
+    def tick(self) -> int:
+        """Refresh every sandbox that is due, returns how many were refreshed."""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for sandbox_id, activity in list(self._activity.items()):
+                if activity.last_active > activity.last_refreshed:
+                    if now - activity.last_refreshed >= self.interval:
+                        due.append(sandbox_id)
+                        activity.last_refreshed = now
+                elif now - activity.last_active > self.ttl:
+                    # Idle past its TTL, the sandbox has expired on its own
+                    del self._activity[sandbox_id]
+                    self.stats.expired += 1
+
+        if not due:
+            return 0
+
+        results = self._executor.map(self._refresh, due)
+        refreshed = sum(results)
+        print(f"Keepalive refreshed {refreshed}/{len(due)} sandboxes: {self.stats.to_dict()}")
+        return refreshed
+
+    def _refresh(self, sandbox_id: str) -> bool:
+        try:
+            self.refresh_fn(sandbox_id, self.ttl)
+        except Exception as e:
+            print(f"Error refreshing TTL for sandbox {sandbox_id}: {e}")
+            with self._lock:
+                self.stats.failures += 1
+            return False
+
+        with self._lock:
+            self.stats.refreshes += 1
+        return True
+
+
+keepalive = KeepaliveScheduler()
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class _Resource:
+    name: str
+    drop: Callable[[str], None]
+    size: Callable[[str], int] | None
+
+
+@dataclass
+class _Session:
+    sandbox_id: str | None
+    last_used: float
+    active: int = 0
+
+
+@dataclass
+class LifecycleStats:
+    sweeps: int = 0
+    evicted_idle: int = 0
+    evicted_memory: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "sweeps": self.sweeps,
+            "evicted_idle": self.evicted_idle,
+            "evicted_memory": self.evicted_memory,
+        }
+
+
+class SessionLifecycle:
+    """
+    Bounds the per-session state a replica holds. Every cache keyed by session
+    registers itself here; sessions idle for idle_seconds are evicted from all
+    of them, and when the sessions together hold more than high_water_bytes the
+    least recently used ones are evicted until usage is back under low_water.
+    Sessions with a request in flight are never evicted. Evicting only drops
+    local state: the session store still maps the session to its sandbox, so
+    a returning user reloads from the sandbox.
+    """
+
+    def __init__(
+        self,
+        *,
+        idle_seconds: float = 300,
+        high_water_bytes: int = 256 * 1024 * 1024,
+        low_water_ratio: float = 0.8,
+        sweep_interval: float = 30,
+        release_fn: Callable[[str], None] | None = None,
+    ):
+        self.idle_seconds = idle_seconds
+        self.high_water_bytes = high_water_bytes
+        self.low_water_bytes = int(high_water_bytes * low_water_ratio)
+        self.sweep_interval = sweep_interval
+        self.release_fn = release_fn
+        self.stats = LifecycleStats()
+
+        self._resources: list[_Resource] = []
+        self._sessions: dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def register(
+        self, name: str, drop: Callable[[str], None], size: Callable[[str], int] | None = None
+    ) -> None:
+        self._resources.append(_Resource(name=name, drop=drop, size=size))
+
+    def touch(self, session_id: str, sandbox_id: str | None = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                self._sessions[session_id] = _Session(sandbox_id=sandbox_id, last_used=now)
+            else:
+                session.last_used = now
+                session.sandbox_id = sandbox_id or session.sandbox_id
+
+    @contextmanager
+    def active(self, session_id: str):
+        """Pin a session for the duration of a request"""
+        self.touch(session_id)
+        with self._lock:
+            self._sessions[session_id].active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    session.active -= 1
+                    session.last_used = time.monotonic()
+
+    def session_bytes(self, session_id: str) -> int:
+        return sum(r.size(session_id) for r in self._resources if r.size is not None)
+
+    def maybe_sweep(self) -> int:
+        """Sweep if sweep_interval has passed; cheap enough to call per request"""
+        if time.monotonic() - self._last_sweep < self.sweep_interval:
+            return 0
+        return self.sweep()
+
+    def sweep(self, now: float | None = None) -> int:
+        now = now if now is not None else time.monotonic()
+        self._last_sweep = now
+        self.stats.sweeps += 1
+
+        with self._lock:
+            candidates = sorted(
+                (s.last_used, session_id)
+                for session_id, s in self._sessions.items()
+                if s.active == 0
+            )
+
+        evicted = 0
+        for last_used, session_id in candidates:
+            if now - last_used > self.idle_seconds:
+                self.evict(session_id)
+                self.stats.evicted_idle += 1
+                evicted += 1
+
+        sizes = {session_id: self.session_bytes(session_id) for session_id in self._sessions}
+        total = sum(sizes.values())
+        if total > self.high_water_bytes:
+            # Oldest first, down to the low-water mark so we don't evict on every sweep
+            for _last_used, session_id in candidates:
+                if total <= self.low_water_bytes:
+                    break
+                if session_id in sizes:
+                    total -= sizes.pop(session_id)
+                    self.evict(session_id)
+                    self.stats.evicted_memory += 1
+                    evicted += 1
+
+        if evicted:
+            print(f"Evicted {evicted} sessions: {self.to_dict()}")
+        return evicted
+
+    def evict(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+
+        for resource in self._resources:
+            try:
+                resource.drop(session_id)
+            except Exception as e:
+                print(f"Error dropping {resource.name} for session {session_id}: {e}")
+
+        if session is not None and session.sandbox_id and self.release_fn is not None:
+            self.release_fn(session.sandbox_id)
+
+    def to_dict(self) -> dict:
+        sizes = {session_id: self.session_bytes(session_id) for session_id in list(self._sessions)}
+        total = sum(sizes.values())
+        largest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:5]
+        return {
+            **self.stats.to_dict(),
+            "resident_sessions": len(sizes),
+            "resident_bytes": total,
+            "bytes_per_session": total // len(sizes) if sizes else 0,
+            "largest_sessions": dict(largest),
+        }
@@ -0,0 +1,159 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Iterable
+from dataclasses import dataclass
+
+
+@dataclass
+class OutboundStats:
+    queued: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    max_queue_depth: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "queue_depth": self.queued,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+def merge_partials(older: dict, newer: dict) -> dict | None:
+    """
+    One message carrying both partials' text, or None if they can't be merged
+    (the newer one doesn't continue where the older one left off)
+    """
+    a, b = older["data"], newer["data"]
+    if "delta" not in b:
+        # Full text supersedes whatever was queued
+        return newer
+
+    if "delta" in a:
+        if a["offset"] + len(a["delta"]) != b["offset"]:
+            return None
+        data = {**a, **b, "delta": a["delta"] + b["delta"], "offset": a["offset"]}
+    elif "text" in a and a.get("offset") == 0:
+        if len(a["text"]) != b["offset"]:
+            return None
+        data = {**a, **b, "text": a["text"] + b["delta"], "offset": 0}
+        del data["delta"]
+    else:
+        return None
+
+    return {**newer, "data": data}
+
+
+class OutboundQueue:
+    """
+    Bounded queue between a message producer and a websocket that may read
+    slower than the producer writes. A streaming partial (a coalesce type)
+    that arrives while an earlier one for the same message id and path is
+    still queued is merged into it and moved to the back, so a slow client
+    gets fewer, larger partials instead of a growing backlog. Everything else
+    is delivered as is: when the queue is full the producer waits for room
+    rather than dropping a message.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = 64,
+        coalesce: Iterable[str] = (),
+        stats: OutboundStats | None = None,
+    ):
+        self.max_depth = max_depth
+        self.coalesce = set(coalesce)
+        self.stats = stats or OutboundStats()
+        self._items: deque[dict] = deque()
+        self._changed = asyncio.Condition()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def _key(self, message: dict) -> tuple | None:
+        if message.get("type") not in self.coalesce:
+            return None
+        return message["type"], message.get("id"), message["data"].get("path")
+
+    def _try_coalesce(self, message: dict) -> bool:
+        key = self._key(message)
+        if key is None:
+            return False
+
+        for i in range(len(self._items) - 1, -1, -1):
+            queued = self._items[i]
+            if self._key(queued) == key:
+                merged = merge_partials(queued, message)
+                if merged is None:
+                    return False
+                del self._items[i]
+                self._items.append(merged)
+                self.stats.coalesced += 1
+                return True
+        return False
+
+    async def put(self, message: dict) -> None:
+        async with self._changed:
+            if self._try_coalesce(message):
+                self._changed.notify_all()
+                return
+
+            if len(self._items) >= self.max_depth:
+                self.stats.blocked += 1
+                await self._changed.wait_for(lambda: len(self._items) < self.max_depth)
+
+            self._items.append(message)
+            self.stats.queued += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._items))
+            self._changed.notify_all()
+
+    async def close(self) -> None:
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    async def get(self) -> dict | None:
+        """Next message, or None once the queue is closed and empty"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._items or self._closed)
+            if not self._items:
+                return None
+            message = self._items.popleft()
+            self.stats.queued -= 1
+            self.stats.sent += 1
+            self._changed.notify_all()
+            return message
+
+    async def stream(self, messages: AsyncGenerator[dict]) -> AsyncIterator[dict]:
+        """
+        Run the producer in the background and yield its messages as the
+        consumer asks for them. If the consumer stops early (the client went
+        away) the producer is cancelled.
+        """
+
+        async def produce():
+            try:
+                async for message in messages:
+                    await self.put(message)
+            finally:
+                # Close the producer here, in the task whose context it ran
+                # in, rather than leaving it to be finalized somewhere else
+                await messages.aclose()
+                await self.close()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (message := await self.get()) is not None:
+                yield message
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+            async with self._changed:
+                self.stats.queued -= len(self._items)
+                self._items.clear()
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .tools import DEFAULT_SANDBOX_TTL, create_app_environment, refresh_ttl
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    refills: int = 0
+    refill_failures: int = 0
+    discarded: int = 0
+    refill_seconds_total: float = 0.0
+    refill_seconds_max: float = 0.0
+
+    def to_dict(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "refills": self.refills,
+            "refill_failures": self.refill_failures,
+            "discarded": self.discarded,
+            "refill_seconds_avg": (
+                self.refill_seconds_total / self.refills if self.refills else 0.0
+            ),
+            "refill_seconds_max": self.refill_seconds_max,
+        }
+
+
+@dataclass
+class _WarmSandbox:
+    env: dict
+    created_at: float
+    refreshed_at: float
+
+
+class SandboxPool:
+    """
+    Keeps a number of app environments created, port-exposed and with the
+    Vite dev server running, so a new session does not wait for sandbox boot.
+    Taken sandboxes are replaced in the background.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        *,
+        create_fn: Callable[[], dict] = lambda: create_app_environment(wait_ready=True),
+        keepalive_fn: Callable[[str], None] = refresh_ttl,
+        max_age_seconds: float = 3600.0,
+        keepalive_seconds: float = DEFAULT_SANDBOX_TTL / 2,
+        check_interval: float = 5.0,
+    ):
+        self.size = size
+        self.create_fn = create_fn
+        self.keepalive_fn = keepalive_fn
+        self.max_age_seconds = max_age_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.check_interval = check_interval
+        self.stats = PoolStats()
+
+        self._idle: deque[_WarmSandbox] = deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(size, 1), thread_name_prefix="sandbox-pool"
+        )
+
+    def start(self) -> None:
+        """Start the background refill loop."""
+        if self.size <= 0 or self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name="sandbox-pool-refill", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def acquire(self) -> dict:
+        """
+        Hand out a warm environment, or create one synchronously if the pool
+        is empty. Either way a refill is scheduled.
+        """
+        env = None
+        with self._lock:
+            if self._idle:
+                env = self._idle.popleft().env
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+        self._wakeup.set()
+
+        if env is not None:
+            print(f"Sandbox pool hit: {env['sandbox_id']}")
+            return env
+
+        print("Sandbox pool miss, creating sandbox inline")
+        return self.create_fn()
+
+    def release(self, env: dict) -> None:
+        """Take back an environment that was acquired but never used"""
+        now = time.monotonic()
+        with self._lock:
+            self._idle.appendleft(_WarmSandbox(env=env, created_at=now, refreshed_at=now))
+        print(f"Sandbox {env['sandbox_id']} returned to the pool")
+
+    def available(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._maintain()
+            self._wakeup.wait(self.check_interval)
+            self._wakeup.clear()
+
+    def _maintain(self) -> None:
+        now = time.monotonic()
+        to_refresh: list[_WarmSandbox] = []
+
+        with self._lock:
+            # Drop sandboxes that have been idle for too long and keep the rest warm
+            fresh = deque()
+            for warm in self._idle:
+                if now - warm.created_at > self.max_age_seconds:
+                    self.stats.discarded += 1
+                    continue
+                if now - warm.refreshed_at > self.keepalive_seconds:
+                    to_refresh.append(warm)
+                fresh.append(warm)
+            self._idle = fresh
+
+            deficit = self.size - len(self._idle) - self._pending
+            self._pending += max(deficit, 0)
+
+        for warm in to_refresh:
+            try:
+                self.keepalive_fn(warm.env["sandbox_id"])
+                warm.refreshed_at = now
+            except Exception as e:
+                print(f"Error refreshing warm sandbox {warm.env['sandbox_id']}: {e}")
+                with self._lock:
+                    if warm in self._idle:
+                        self._idle.remove(warm)
+                        self.stats.discarded += 1
+
+        for _ in range(max(deficit, 0)):
+            self._executor.submit(self._refill_one)
+
+    def _refill_one(self) -> None:
+        start = time.monotonic()
+        try:
+            env = self.create_fn()
+        except Exception as e:
+            print(f"Error refilling sandbox pool: {e}")
+            with self._lock:
+                self._pending -= 1
+                self.stats.refill_failures += 1
+            return
+
+        elapsed = time.monotonic() - start
+        now = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+            self._idle.append(_WarmSandbox(env=env, created_at=now, refreshed_at=now))
+            self.stats.refills += 1
+            self.stats.refill_seconds_total += elapsed
+            self.stats.refill_seconds_max = max(self.stats.refill_seconds_max, elapsed)
+
+        print(f"Sandbox pool refilled in {elapsed:.1f}s ({self.available()}/{self.size})")
@@ -0,0 +1,213 @@
+import json
+from dataclasses import dataclass
+
+from baml_py import Collector
+
+from .context import OMITTED, estimate_tokens
+
+
+@dataclass
+class PromptParts:
+    code_files: list[dict]
+    changed_files: list[dict]
+    refolded: bool
+
+
+@dataclass
+class _Prefix:
+    files: dict[str, str]
+    package_json: str
+    tokens: int
+
+
+@dataclass
+class PromptCacheStats:
+    turns: int = 0
+    refolds: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def to_dict(self) -> dict:
+        # Anthropic's input_tokens excludes cached tokens, so this is the whole prompt
+        prompt_tokens = self.cache_read_tokens + self.cache_write_tokens + self.input_tokens
+        return {
+            "turns": self.turns,
+            "refolds": self.refolds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cache_read_ratio": (
+                self.cache_read_tokens / prompt_tokens if prompt_tokens else 0.0
+            ),
+        }
+
+
+@dataclass
+class TurnUsage:
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cache_read_tokens: int | None = None
+    cache_write_tokens: int | None = None
+    ttft_ms: int | None = None
+    duration_ms: int | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "ttft_ms": self.ttft_ms,
+            "duration_ms": self.duration_ms,
+        }
+
+
+def _raw_usage(call) -> dict | None:
+    """
+    Anthropic's usage block from a call's raw response. A streamed call's body
+    is the SSE event stream: message_start carries the input and cache counts,
+    and message_delta the final output count.
+    """
+    try:
+        body = call.http_response.body.text()
+    except Exception:
+        return None
+
+    try:
+        return json.loads(body).get("usage")
+    except ValueError:
+        pass
+
+    usage = None
+    for line in body.splitlines():
+        if not line.startswith("data:"):
+            continue
+        try:
+            event = json.loads(line.removeprefix("data:"))
+        except ValueError:
+            continue
+        if event.get("type") == "message_start":
+            usage = {**(usage or {}), **event.get("message", {}).get("usage", {})}
+        elif event.get("type") == "message_delta":
+            usage = {**(usage or {}), **event.get("usage", {})}
+    return usage
+
+
+def turn_usage(collector: Collector) -> TurnUsage:
+    """
+    Token and timing numbers summed over the calls made with this collector.
+    BAML's Usage only has input/output tokens, so the cache counters are read
+    from Anthropic's usage block in the raw response when it is available.
+    """
+    usage = TurnUsage()
+    for log in collector.logs:
+        usage.input_tokens = (usage.input_tokens or 0) + (log.usage.input_tokens or 0)
+        usage.output_tokens = (usage.output_tokens or 0) + (log.usage.output_tokens or 0)
+        usage.duration_ms = (usage.duration_ms or 0) + (log.timing.duration_ms or 0)
+
+        call = log.selected_call
+        if call is None:
+            continue
+
+        if usage.ttft_ms is None:
+            usage.ttft_ms = getattr(call.timing, "time_to_first_token_ms", None)
+        raw = _raw_usage(call)
+        if raw is None:
+            print(f"No usage block in the {call.client_name} response, cache tokens unknown")
+            continue
+        if "cache_read_input_tokens" in raw:
+            usage.cache_read_tokens = (usage.cache_read_tokens or 0) + raw[
+                "cache_read_input_tokens"
+            ]
+        if "cache_creation_input_tokens" in raw:
+            usage.cache_write_tokens = (usage.cache_write_tokens or 0) + raw[
+                "cache_creation_input_tokens"
+            ]
+    return usage
+
+
+class PromptLayout:
+    """
+    Splits the EditCode code listing into a cached prefix and a per-turn tail.
+
+    Anthropic only reuses a cached prompt when everything up to a breakpoint is
+    byte-for-byte the same, so the code listing sent before the breakpoint is
+    frozen per session. Files that changed since it was frozen (or that the
+    context selector now wants in full) go after the breakpoint instead, and
+    the prompt tells the model they supersede the listing. Once that tail grows
+    past refold_ratio of the prefix, or package.json changes, the listing is
+    rebuilt from the current code and the next turn pays for one cache write.
+    """
+
+    def __init__(self, refold_ratio: float = 0.5):
+        self.refold_ratio = refold_ratio
+        self.stats = PromptCacheStats()
+        self._prefixes: dict[str, _Prefix] = {}
+
+    def split(
+        self,
+        session_id: str,
+        code_map: dict[str, str],
+        code_files: list[dict],
+        package_json: str,
+    ) -> PromptParts:
+        """code_files is the context selection, code_map the actual code"""
+        selected = {f["path"]: f["content"] for f in code_files}
+        prefix = self._prefixes.get(session_id)
+
+        if prefix is not None and prefix.package_json == package_json:
+            changed = self._changed(prefix, code_map, selected)
+            if changed is not None:
+                changed_tokens = sum(estimate_tokens(f["content"]) for f in changed)
+                if changed_tokens <= prefix.tokens * self.refold_ratio:
+                    return PromptParts(
+                        code_files=self._listing(prefix.files),
+                        changed_files=changed,
+                        refolded=False,
+                    )
+
+        files = dict(sorted(selected.items()))
+        self._prefixes[session_id] = _Prefix(
+            files=files,
+            package_json=package_json,
+            tokens=sum(estimate_tokens(c) for c in files.values()),
+        )
+        self.stats.refolds += 1
+        return PromptParts(code_files=self._listing(files), changed_files=[], refolded=True)
+
+    def _changed(
+        self, prefix: _Prefix, code_map: dict[str, str], selected: dict[str, str]
+    ) -> list[dict] | None:
+        """Files the tail has to carry, or None if the prefix can't be patched"""
+        if any(path not in code_map for path in prefix.files):
+            # A deleted file would stay in the listing, rebuild it instead
+            return None
+
+        changed = []
+        for path, content in selected.items():
+            sent = prefix.files.get(path)
+            if sent is None:
+                changed.append({"path": path, "content": content})
+            elif sent == OMITTED:
+                if content != OMITTED:
+                    changed.append({"path": path, "content": content})
+            elif sent != code_map[path]:
+                # The listing has stale contents, always send the new version
+                changed.append({"path": path, "content": code_map[path]})
+        return changed
+
+    def _listing(self, files: dict[str, str]) -> list[dict]:
+        return [{"path": path, "content": content} for path, content in files.items()]
+
+    def record(self, usage: TurnUsage) -> None:
+        self.stats.turns += 1
+        self.stats.input_tokens += usage.input_tokens or 0
+        self.stats.output_tokens += usage.output_tokens or 0
+        self.stats.cache_read_tokens += usage.cache_read_tokens or 0
+        self.stats.cache_write_tokens += usage.cache_write_tokens or 0
+
+    def drop(self, session_id: str) -> None:
+        self._prefixes.pop(session_id, None)
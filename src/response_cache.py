@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from baml_client import partial_types
+from baml_client.types import Message as ConvoMessage
+
+from .edits import generated_file
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def response_key(code_hash: str, history: list[ConvoMessage], feedback: str) -> str:
+    """Cache key for an EditCode call; whitespace differences don't matter"""
+    payload = json.dumps(
+        {
+            "code": code_hash,
+            "history": [[msg.role, _normalize(msg.content)] for msg in history],
+            "feedback": _normalize(feedback),
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    plan: str
+    files: dict[str, str]
+    package_json: str | None
+    created_at: float
+
+
+async def replay(response: CachedResponse):
+    """
+    Yield a cached response as EditCode partials, so it goes through the same
+    AGENT_PARTIAL / AGENT_FINAL / UPDATE_FILE flow as a live generation.
+    """
+    yield partial_types.CodeChanges(
+        plan=partial_types.StreamState(value=response.plan, state="Incomplete"), files=[]
+    )
+
+    files: list[partial_types.GeneratedFile] = []
+    plan = partial_types.StreamState(value=response.plan, state="Complete")
+    yield partial_types.CodeChanges(plan=plan, files=files)
+    for path, content in response.files.items():
+        files = [*files, generated_file(path, content)]
+        yield partial_types.CodeChanges(plan=plan, files=files)
+
+    if response.package_json:
+        yield partial_types.CodeChanges(
+            plan=plan, files=files, package_json=response.package_json
+        )
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    joins: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "joins": self.joins,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """
+    LRU cache of finished EditCode responses with a TTL. Generations that are
+    still streaming are tracked too, so an identical request that arrives
+    meanwhile (a double-click) waits for that one instead of starting a second
+    generation.
+
+    Keys cover the code and history a request starts from, and a finished
+    turn changes both, so in practice this only dedupes concurrent duplicates:
+    the same feedback resent after a turn completes is a new generation.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _lookup(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """A cached response, waiting for an identical in-flight one if needed"""
+        entry = self._lookup(key)
+        if entry is None and key in self._inflight:
+            self.stats.joins += 1
+            entry = await asyncio.shield(self._inflight[key])
+
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def begin(self, key: str) -> None:
+        if key not in self._inflight:
+            self._inflight[key] = asyncio.get_running_loop().create_future()
+
+    def finish(self, key: str, response: CachedResponse | None) -> None:
+        """Complete an in-flight generation; None means it failed or was abandoned"""
+        if response is not None:
+            self.put(key, response)
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def size(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,219 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+class SessionStore(ABC):
+    """
+    Maps session ids to their sandbox environment ({"sandbox_id", "url"}).
+    Entries expire ttl seconds after they were last written or touched, which
+    should match how long an idle sandbox is kept alive.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, data: dict, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def touch(self, session_id: str, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, purge_interval: float = 60):
+        self.purge_interval = purge_interval
+        self._entries: dict[str, tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[session_id]
+                return None
+            return dict(data)
+
+    def put(self, session_id: str, data: dict, ttl: float) -> None:
+        with self._lock:
+            self._entries[session_id] = (dict(data), time.time() + ttl)
+            self._purge()
+
+    def touch(self, session_id: str, ttl: float) -> None:
+        with self._lock:
+            if session_id in self._entries:
+                data, _ = self._entries[session_id]
+                self._entries[session_id] = (data, time.time() + ttl)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def _purge(self) -> None:
+        # Expired entries are otherwise only dropped when they are read
+        now = time.time()
+        if now - self._last_purge >= self.purge_interval:
+            self._entries = {
+                session_id: entry
+                for session_id, entry in self._entries.items()
+                if entry[1] >= now
+            }
+            self._last_purge = now
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Durable store in a local SQLite file, so a restarted replica (or another
+    process sharing the volume) finds the sandboxes sessions already have.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 60):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, data: dict, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(data), time.time() + ttl),
+            )
+            self._purge()
+
+    def touch(self, session_id: str, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sessions SET expires_at = ? WHERE session_id = ?",
+                (time.time() + ttl, session_id),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def _purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge >= self.purge_interval:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+            self._last_purge = now
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    touches: int = 0
+    touches_saved: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "touches": self.touches,
+            "touches_saved": self.touches_saved,
+        }
+
+
+class CachedSessionStore(SessionStore):
+    """
+    Local read-through cache in front of another store. Reads are served from
+    memory for cache_seconds; TTL refreshes are only sent to the backend once
+    a quarter of the TTL has passed since the last one, so an active session
+    costs a backend write every few minutes rather than on every message.
+    """
+
+    def __init__(self, backend: SessionStore, ttl: float, cache_seconds: float = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self.cache_seconds = cache_seconds
+        self.stats = SessionCacheStats()
+        self._cache: dict[str, tuple[dict, float]] = {}
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(session_id)
+        if entry is not None and now - entry[1] < self.cache_seconds:
+            self.stats.hits += 1
+            self.touch(session_id, self.ttl)
+            return dict(entry[0])
+
+        self.stats.misses += 1
+        data = self.backend.get(session_id)
+        with self._lock:
+            if data is None:
+                self._cache.pop(session_id, None)
+                return None
+            self._cache[session_id] = (data, now)
+        self.touch(session_id, self.ttl)
+        return dict(data)
+
+    def put(self, session_id: str, data: dict, ttl: float | None = None) -> None:
+        self.backend.put(session_id, data, ttl or self.ttl)
+        now = time.time()
+        with self._lock:
+            self._cache[session_id] = (dict(data), now)
+            self._touched[session_id] = now
+
+    def touch(self, session_id: str, ttl: float | None = None) -> None:
+        now = time.time()
+        ttl = ttl or self.ttl
+        with self._lock:
+            if now - self._touched.get(session_id, 0) < ttl / 4:
+                self.stats.touches_saved += 1
+                return
+            self._touched[session_id] = now
+        self.stats.touches += 1
+        self.backend.touch(session_id, ttl)
+
+    def delete(self, session_id: str) -> None:
+        self.backend.delete(session_id)
+        self.forget(session_id)
+
+    def forget(self, session_id: str) -> None:
+        """Drop the local copy only"""
+        with self._lock:
+            self._cache.pop(session_id, None)
+            self._touched.pop(session_id, None)
+
+
+def make_session_store(url: str, ttl: float) -> CachedSessionStore:
+    """memory:// or sqlite:///path/to/sessions.db, wrapped in a local cache"""
+    if url.startswith("sqlite://"):
+        backend = SQLiteSessionStore(url.removeprefix("sqlite://"))
+    elif url in ("", "memory", "memory://"):
+        backend = MemorySessionStore()
+    else:
+        raise ValueError(f"Unsupported session store: {url}")
+    return CachedSessionStore(backend, ttl=ttl)
@@ -0,0 +1,125 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+from .tools import DEFAULT_CODE_PATH, DEFAULT_PROJECT_ROOT
+
+PACKAGE_JSON_PATH = f"{DEFAULT_PROJECT_ROOT}/package.json"
+
+
+def content_hash(content: str | bytes) -> str:
+    """Stable hash of a file's content"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def _as_text(content: str | bytes) -> str:
+    if isinstance(content, bytes):
+        return content.decode("utf-8", errors="replace")
+    return content
+
+
+@dataclass
+class SnapshotEntry:
+    content: str
+    hash: str
+    mtime: float
+
+    @classmethod
+    def new(cls, content: str | bytes) -> "SnapshotEntry":
+        text = _as_text(content)
+        return cls(content=text, hash=content_hash(text), mtime=time.time())
+
+
+@dataclass
+class SnapshotStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+@dataclass
+class CodeSnapshot:
+    """
+    In-memory copy of a session's code under DEFAULT_CODE_PATH plus package.json.
+    Only trusted while it has been fully loaded once and nothing is known to
+    have changed in the sandbox behind our back.
+    """
+
+    files: dict[str, SnapshotEntry] = field(default_factory=dict)
+    package_json: str | None = None
+    loaded: bool = False
+    diverged: bool = False
+
+    def is_valid(self) -> bool:
+        return self.loaded and not self.diverged
+
+    def load(self, file_map: dict, package_json: str) -> None:
+        self.files = {path: SnapshotEntry.new(content) for path, content in file_map.items()}
+        self.package_json = package_json
+        self.loaded = True
+        self.diverged = False
+
+    def put(self, path: str, content: str | bytes) -> None:
+        if path == PACKAGE_JSON_PATH:
+            self.package_json = _as_text(content)
+        elif path.startswith(f"{DEFAULT_CODE_PATH}/"):
+            self.files[path] = SnapshotEntry.new(content)
+
+    def get(self, path: str) -> SnapshotEntry | None:
+        if self.diverged:
+            return None
+        return self.files.get(path)
+
+    def mark_diverged(self) -> None:
+        self.diverged = True
+
+    def state_hash(self) -> str:
+        """Hash of the whole code state, built from the per-file hashes"""
+        digest = hashlib.sha256()
+        for path in sorted(self.files):
+            digest.update(f"{path}\0{self.files[path].hash}\0".encode())
+        digest.update(content_hash(self.package_json or "").encode("utf-8"))
+        return digest.hexdigest()
+
+    def code_map(self) -> dict[str, str]:
+        return {path: entry.content for path, entry in self.files.items()}
+
+    def size(self) -> int:
+        total = sum(len(entry.content) for entry in self.files.values())
+        return total + len(self.package_json or "")
+
+
+class SnapshotCache:
+    """Per-session code snapshots with shared hit/miss counters"""
+
+    def __init__(self):
+        self._snapshots: dict[str, CodeSnapshot] = {}
+        self.stats = SnapshotStats()
+
+    def get(self, session_id: str) -> CodeSnapshot:
+        if session_id not in self._snapshots:
+            self._snapshots[session_id] = CodeSnapshot()
+        return self._snapshots[session_id]
+
+    def drop(self, session_id: str) -> None:
+        self._snapshots.pop(session_id, None)
+
+    def session_bytes(self, session_id: str) -> int:
+        snapshot = self._snapshots.get(session_id)
+        return snapshot.size() if snapshot is not None else 0
+
+    def record_hit(self, nbytes: int) -> None:
+        self.stats.hits += 1
+        self.stats.bytes_saved += nbytes
+
+    def record_miss(self) -> None:
+        self.stats.misses += 1
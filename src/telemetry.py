@@ -0,0 +1,276 @@
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+
+# Sandbox methods that are a round trip to the sandbox, counted as rpcs
+_FS_RPCS = {"list_files", "stat_file", "download_file", "upload_file"}
+_PROCESS_RPCS = {"exec"}
+
+
+class Span:
+    """
+    One timed stage of a request. Counters (bytes_in, bytes_out, rpcs) can be
+    added to from the worker threads a stage fans out to.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.error: str | None = None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, key: str, amount: int | float = 1) -> None:
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def otlp_request(spans: list[Span], service_name: str) -> dict:
+    """An OTLP/JSON ExportTraceServiceRequest for spans"""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [_otlp_attribute("service.name", service_name)]
+                },
+                "scopeSpans": [
+                    {"scope": {"name": __name__}, "spans": [s.to_otlp() for s in spans]}
+                ],
+            }
+        ]
+    }
+
+
+class FileExporter:
+    """Appends one OTLP/JSON request per trace to a file, as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, request: dict) -> None:
+        line = json.dumps(request)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class OTLPHTTPExporter:
+    """
+    Posts OTLP/JSON to a collector (e.g. http://localhost:4318/v1/traces) from
+    a background thread, so a slow or missing collector never holds up a
+    request. Traces queued beyond max_queue are dropped.
+    """
+
+    def __init__(self, url: str, max_queue: int = 1000, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        threading.Thread(target=self._run, name="otlp-export", daemon=True).start()
+
+    def export(self, request: dict) -> None:
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            body = json.dumps(request).encode("utf-8")
+            try:
+                urllib.request.urlopen(
+                    urllib.request.Request(
+                        self.url, data=body, headers={"Content-Type": "application/json"}
+                    ),
+                    timeout=self.timeout,
+                ).close()
+            except Exception as e:
+                print(f"Error exporting traces to {self.url}: {e}")
+
+
+def make_exporter(url: str):
+    """file:///path/to/traces.jsonl or an OTLP/HTTP traces endpoint"""
+    if not url:
+        return None
+    if url.startswith("file://"):
+        return FileExporter(url.removeprefix("file://"))
+    if url.startswith(("http://", "https://")):
+        return OTLPHTTPExporter(url)
+    raise ValueError(f"Unsupported trace exporter: {url}")
+
+
+class _CountedCalls:
+    def __init__(self, target, rpcs: set[str], span: Span):
+        self._target = target
+        self._rpcs = rpcs
+        self._span = span
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if name not in self._rpcs:
+            return attr
+
+        def call(*args, **kwargs):
+            self._span.add("rpcs")
+            return attr(*args, **kwargs)
+
+        return call
+
+
+class _CountedSandbox:
+    def __init__(self, sandbox, span: Span):
+        self._sandbox = sandbox
+        self.fs = _CountedCalls(sandbox.fs, _FS_RPCS, span)
+        self.process = _CountedCalls(sandbox.process, _PROCESS_RPCS, span)
+
+    def __getattr__(self, name: str):
+        return getattr(self._sandbox, name)
+
+
+class Tracer:
+    """
+    Span tracing for requests. Spans nest through a context variable, so a
+    stage started inside another (including in LaneExecutor threads and tasks
+    created while it is open) becomes its child. When a trace's root span
+    ends the whole trace is handed to the exporter, if one is configured.
+    """
+
+    def __init__(self, service_name: str = "beam-agent", exporter=None):
+        self.service_name = service_name
+        self.exporter = exporter
+        self._current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+        self._traces: dict[str, list[Span]] = {}
+        self._lock = threading.Lock()
+
+    def current(self) -> Span | None:
+        return self._current.get()
+
+    def start(self, name: str, **attributes) -> Span:
+        """Start a span under the current one without making it current"""
+        parent = self.current()
+        trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+        if parent is None:
+            with self._lock:
+                self._traces[trace_id] = []
+        return span
+
+    def end(self, span: Span) -> None:
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        with self._lock:
+            trace = self._traces.get(span.trace_id)
+            if trace is None:
+                # A child that outlived its root goes out on its own
+                finished = [span]
+            elif span.parent_id is None:
+                finished = [*self._traces.pop(span.trace_id), span]
+            else:
+                trace.append(span)
+                return
+
+        if self.exporter is not None:
+            try:
+                self.exporter.export(otlp_request(finished, self.service_name))
+            except Exception as e:
+                print(f"Error exporting trace {span.trace_id}: {e}")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self.start(name, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.end(span)
+            # An async generator closed from another task's context can't
+            # reset it; the span has ended either way
+            with suppress(ValueError):
+                self._current.reset(token)
+
+    def add(self, key: str, amount: int | float = 1) -> None:
+        """Add to a counter on the current span, if there is one"""
+        span = self.current()
+        if span is not None:
+            span.add(key, amount)
+
+    def count_rpcs(self, sandbox):
+        """Count the sandbox's RPCs against the current span"""
+        span = self.current()
+        return sandbox if span is None else _CountedSandbox(sandbox, span)
+
+    def summary(self, root: Span) -> dict:
+        """Per-stage milliseconds and totals for the spans of root's trace so far"""
+        with self._lock:
+            spans = [*self._traces.get(root.trace_id, []), root]
+
+        stages: dict[str, float] = {}
+        totals = {"bytes_in": 0, "bytes_out": 0, "rpcs": 0}
+        extra = {}
+        for span in spans:
+            if span is not root:
+                stages[span.name] = stages.get(span.name, 0.0) + span.duration_ms
+            for key in totals:
+                totals[key] += span.attributes.get(key, 0)
+            for key in ("ttft_ms", "output_tokens", "tokens_per_second"):
+                if key in span.attributes:
+                    extra[key] = span.attributes[key]
+
+        return {
+            "trace_id": root.trace_id,
+            "total_ms": root.duration_ms,
+            "stages": {name: round(ms, 1) for name, ms in stages.items()},
+            **totals,
+            **extra,
+        }
+
+
+tracer = Tracer()
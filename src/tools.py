@@ -1,10 +1,23 @@
+import functools
+import io
 import os
+import posixpath
+import tarfile
 import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from urllib.parse import urlparse
 
 from beam import Image, Sandbox
 
+from .executor import Lane, LaneExecutor
+from .handles import sandbox_handles
+from .keepalive import DEFAULT_SANDBOX_TTL, keepalive
+from .telemetry import tracer
+
 image = (
     Image()
     .from_registry("node:20")
@@ -20,12 +33,41 @@ image = (
 
 DEFAULT_CODE_PATH = "/app/src"
 DEFAULT_PROJECT_ROOT = "/app"
+LOAD_CODE_CONCURRENCY = int(os.getenv("LOAD_CODE_CONCURRENCY", "8"))
+LOAD_CODE_RETRIES = 2
+TREE_SKIP_DIRS = ["node_modules", ".git", "dist", "build"]
+DEV_SERVER_PORT = 3000
+
+
+def _exit_code(result) -> int:
+    """Normalise the value returned by SandboxProcess.wait() across client versions."""
+    return getattr(result, "returncode", result)
+
+
+def _wait_for_dev_server(sandbox, timeout: float = 120.0, interval: float = 1.0) -> bool:
+    """Poll the Vite dev server from inside the sandbox until it answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = sandbox.process.exec(
+                "sh",
+                "-c",
+                f"curl -sf -o /dev/null http://localhost:{DEV_SERVER_PORT}",
+            ).wait()
+            if _exit_code(result) == 0:
+                return True
+        except Exception as e:
+            print(f"Dev server check failed: {e}")
+        time.sleep(interval)
 
+    return False
 
-def create_app_environment() -> dict:
+
+def create_app_environment(wait_ready: bool = False) -> dict:
     """
     Creates a new sandbox environment with Vite dev server.
     Configures Vite to work properly in Beam Cloud environment.
+    If wait_ready is set, blocks until the dev server responds.
     """
     print("Creating app environment...")
 
@@ -34,11 +76,11 @@ def create_app_environment() -> dict:
         cpu=1,
         memory=1024,
         image=image,
-        keep_warm_seconds=300,
+        keep_warm_seconds=DEFAULT_SANDBOX_TTL,
     ).create()
 
     # Expose port and get URL
-    url = sandbox.expose_port(3000)
+    url = sandbox.expose_port(DEV_SERVER_PORT)
     hostname = urlparse(url).hostname
     print(f"React app URL: {url}")
     print(f"Hostname: {hostname}")
@@ -49,9 +91,12 @@ def create_app_environment() -> dict:
     sandbox.process.exec(
         "sh",
         "-c",
-        "cd /app && __VITE_ADDITIONAL_SERVER_ALLOWED_HOSTS=.beam.cloud npm run dev -- --host :: --port 3000",
+        f"cd /app && __VITE_ADDITIONAL_SERVER_ALLOWED_HOSTS=.beam.cloud npm run dev -- --host :: --port {DEV_SERVER_PORT}",
     )
 
+    if wait_ready and not _wait_for_dev_server(sandbox):
+        raise RuntimeError(f"Vite dev server did not start in sandbox {sandbox.sandbox_id()}")
+
     print(f"✅ React app created and started successfully! Access it at: {url}")
     
     return {
@@ -60,61 +105,167 @@ def create_app_environment() -> dict:
     }
 
 
-def load_code(sandbox_id: str) -> tuple[dict, str]:
+def refresh_ttl(sandbox_id: str, ttl: int = DEFAULT_SANDBOX_TTL) -> None:
+    """Extend the keep-warm TTL of a sandbox."""
+    with sandbox_handles.handle(sandbox_id) as sandbox:
+        sandbox.update_ttl(ttl)
+
+
+def load_code(
+    sandbox_id: str, bulk: bool = True, executor: LaneExecutor | None = None
+) -> tuple[dict, str]:
     """
     Loads all code files from the sandbox.
     Returns a tuple of (file_map, package_json).
     """
     print(f"Loading code for sandbox {sandbox_id}")
 
-    sandbox = Sandbox().connect(sandbox_id)
-    sandbox.update_ttl(300)
+    with tracer.span("sandbox.load_code", sandbox_id=sandbox_id) as span:
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
 
-    file_map = {}
+            file_map, package_json = read_code(sandbox, bulk=bulk, executor=executor)
+
+        span.set(files=len(file_map))
+        span.add("bytes_in", sum(len(c) for c in file_map.values()) + len(package_json))
+        return file_map, package_json
 
-    def _process_directory(dir_path: str):
-        """Recursively process directory and load all files."""
+
+def read_code(
+    sandbox,
+    bulk: bool = True,
+    concurrency: int = LOAD_CODE_CONCURRENCY,
+    executor: LaneExecutor | None = None,
+) -> tuple[dict, str]:
+    """
+    Reads all code files from a connected sandbox.
+    Uses a single archive download when bulk is set, falling back to
+    downloading files individually on the executor's fetch lane, or up to
+    `concurrency` at a time without one.
+    """
+    if bulk:
         try:
-            for file in sandbox.fs.list_files(dir_path):
-                full_path = Path(dir_path) / file.name
+            return _read_code_archive(sandbox)
+        except Exception as e:
+            print(f"Bulk code load failed, falling back to per-file download: {e}")
+
+    return _read_code_per_file(sandbox, concurrency=concurrency, executor=executor)
+
+
+def _read_code_archive(sandbox) -> tuple[dict, str]:
+    """Pack the code directory and package.json into one tarball and unpack it in memory."""
+    archive_path = f"/tmp/code-{uuid.uuid4().hex}.tar.gz"
+    code_dir = posixpath.relpath(DEFAULT_CODE_PATH, DEFAULT_PROJECT_ROOT)
+
+    result = sandbox.process.exec(
+        "tar", "-czf", archive_path, "-C", DEFAULT_PROJECT_ROOT, code_dir, "package.json"
+    ).wait()
+    if _exit_code(result) != 0:
+        raise RuntimeError(f"tar exited with {_exit_code(result)}")
+
+    try:
+        with tempfile.NamedTemporaryFile() as temp_file:
+            sandbox.fs.download_file(archive_path, temp_file.name)
+            # The client replaces the file rather than writing into it, so
+            # read it back by path; this handle still points at the old one
+            with open(temp_file.name, "rb") as f:
+                data = f.read()
+    finally:
+        # Not waited on, the archive only needs to be gone eventually
+        sandbox.process.exec("rm", "-f", archive_path)
+
+    file_map = {}
+    package_json = "{}"
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+
+            path = posixpath.normpath(posixpath.join(DEFAULT_PROJECT_ROOT, member.name))
+            content = archive.extractfile(member).read()
+            if path == f"{DEFAULT_PROJECT_ROOT}/package.json":
+                package_json = content.decode("utf-8")
+            else:
+                file_map[path] = content
+
+    print(f"Loaded {len(file_map)} files from sandbox archive ({len(data)} bytes)")
+    return dict(sorted(file_map.items())), package_json
+
+
+def _download_bytes(sandbox, sandbox_path: str, retries: int = 0) -> bytes:
+    """Download a single file, retrying transient failures with a short backoff."""
+    for attempt in range(retries + 1):
+        with tempfile.NamedTemporaryFile() as temp_file:
+            try:
+                sandbox.fs.download_file(sandbox_path, temp_file.name)
+                # Replaced rather than written into, as in _read_code_archive
+                with open(temp_file.name, "rb") as f:
+                    return f.read()
+            except Exception:
+                if attempt == retries:
+                    raise
+        time.sleep(0.1 * 2**attempt)
+
+
+def _read_code_per_file(
+    sandbox, concurrency: int = LOAD_CODE_CONCURRENCY, executor: LaneExecutor | None = None
+) -> tuple[dict, str]:
+    """
+    Walk the code directory and download every file individually. Directory
+    listings and downloads run in parallel on the executor's shared fetch
+    lane, or on up to `concurrency` threads of their own without one; the
+    returned file_map is sorted by path so prompts stay stable.
+    """
+    if executor is not None:
+        return _walk_code(sandbox, functools.partial(executor.submit, Lane.FETCH))
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        return _walk_code(sandbox, pool.submit)
 
+
+def _walk_code(sandbox, submit: Callable[..., Future]) -> tuple[dict, str]:
+    file_map = {}
+
+    package_future = submit(
+        _download_bytes, sandbox, f"{DEFAULT_PROJECT_ROOT}/package.json", LOAD_CODE_RETRIES
+    )
+    # future -> (path, is_dir)
+    pending = {submit(sandbox.fs.list_files, DEFAULT_CODE_PATH): (DEFAULT_CODE_PATH, True)}
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, is_dir = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                kind = "directory" if is_dir else "file"
+                print(f"Error loading {kind} {path}: {e}")
+                continue
+
+            if not is_dir:
+                file_map[path] = result
+                continue
+
+            for file in result:
+                full_path = str(Path(path) / file.name)
                 if file.is_dir:
-                    # Recursively process subdirectories
-                    _process_directory(str(full_path))
+                    child = submit(sandbox.fs.list_files, full_path)
                 else:
-                    # Download file
-                    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                        try:
-                            sandbox.fs.download_file(str(full_path), temp_file.name)
-                            temp_file.seek(0)
-                            file_content = temp_file.read()
-                            file_map[str(full_path)] = file_content
-                        except Exception as e:
-                            print(f"Error loading file {full_path}: {e}")
-                        finally:
-                            os.unlink(temp_file.name)
-        except Exception as e:
-            print(f"Error processing directory {dir_path}: {e}")
-
-    _process_directory(DEFAULT_CODE_PATH)
-    print(f"Loaded {len(file_map)} files from sandbox")
+                    child = submit(_download_bytes, sandbox, full_path, LOAD_CODE_RETRIES)
+                pending[child] = (full_path, file.is_dir)
 
-    # Load package.json
     package_json = "{}"
-    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-        try:
-            sandbox.fs.download_file(f"{DEFAULT_PROJECT_ROOT}/package.json", temp_file.name)
-            temp_file.seek(0)
-            package_json = temp_file.read().decode("utf-8")
-        except Exception as e:
-            print(f"Error loading package.json: {e}")
-        finally:
-            os.unlink(temp_file.name)
+    try:
+        package_json = package_future.result().decode("utf-8")
+    except Exception as e:
+        print(f"Error loading package.json: {e}")
 
-    return file_map, package_json
+    print(f"Loaded {len(file_map)} files from sandbox")
+    return dict(sorted(file_map.items())), package_json
 
 
-def edit_code(sandbox_id: str, code_map: dict) -> dict:
+def edit_code(sandbox_id: str, code_map: dict, batched: bool = True) -> dict:
     """
     Edits code files in the sandbox.
     Creates parent directories if they don't exist.
@@ -122,9 +273,96 @@ def edit_code(sandbox_id: str, code_map: dict) -> dict:
     print(f"Editing code for sandbox {sandbox_id}")
     print(f"Updating {len(code_map)} files...")
 
-    sandbox = Sandbox().connect(sandbox_id)
-    sandbox.update_ttl(300)
+    with tracer.span("sandbox.edit_code", sandbox_id=sandbox_id, files=len(code_map)) as span:
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
+
+            updated, failed = write_code(sandbox, code_map, batched=batched)
+
+        span.set(failed=len(failed))
+        span.add(
+            "bytes_out",
+            sum(len(c if isinstance(c, bytes) else c.encode("utf-8")) for c in code_map.values()),
+        )
+
+    print(f"✅ Finished updating {len(updated)}/{len(code_map)} files")
+    
+    return {"sandbox_id": sandbox_id, "updated": updated, "failed": failed}
+
+
+def write_code(sandbox, code_map: dict, batched: bool = True) -> tuple[list, list]:
+    """
+    Writes code files to a connected sandbox.
+    Returns a tuple of (updated_paths, failed_paths). In batched mode, files
+    that did not make it out of the archive are retried one by one.
+    """
+    if not batched:
+        return _write_code_per_file(sandbox, code_map)
+
+    try:
+        updated, failed = _write_code_archive(sandbox, code_map)
+    except Exception as e:
+        print(f"Batched code write failed, falling back to per-file upload: {e}")
+        updated, failed = [], list(code_map)
+
+    if failed:
+        retried, failed = _write_code_per_file(
+            sandbox, {path: code_map[path] for path in failed}
+        )
+        updated += retried
+
+    return updated, failed
+
 
+def _write_code_archive(sandbox, code_map: dict) -> tuple[list, list]:
+    """Upload all files as one tarball and extract it with a single exec."""
+    archive_path = f"/tmp/edit-{uuid.uuid4().hex}.tar"
+    members, failed = {}, []
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for sandbox_path, content in code_map.items():
+            if not sandbox_path.startswith("/"):
+                print(f"Relative path {sandbox_path} left for per-file upload")
+                failed.append(sandbox_path)
+                continue
+
+            data = content if isinstance(content, bytes) else content.encode("utf-8")
+            info = tarfile.TarInfo(posixpath.normpath(sandbox_path).lstrip("/"))
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+            members[info.name] = sandbox_path
+
+    with tempfile.NamedTemporaryFile() as temp_file:
+        temp_file.write(buffer.getvalue())
+        temp_file.flush()
+        sandbox.fs.upload_file(temp_file.name, archive_path)
+
+    # tar creates any missing parent directories while extracting
+    process = sandbox.process.exec("tar", "-xvf", archive_path, "-C", "/")
+    exit_code = _exit_code(process.wait())
+    extracted = {line.strip() for line in process.stdout.read().splitlines()}
+    sandbox.process.exec("rm", "-f", archive_path)
+
+    updated = []
+    for name, sandbox_path in members.items():
+        if name in extracted:
+            updated.append(sandbox_path)
+            print(f"✅ Updated: {sandbox_path}")
+        else:
+            failed.append(sandbox_path)
+
+    if exit_code != 0:
+        print(f"Warning: tar exited with {exit_code}")
+
+    return updated, failed
+
+
+def _write_code_per_file(sandbox, code_map: dict) -> tuple[list, list]:
+    """Upload files one at a time, creating parent directories as needed."""
+    updated, failed = [], []
     for sandbox_path, content in code_map.items():
         with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as temp_file:
             try:
@@ -142,22 +380,22 @@ def edit_code(sandbox_id: str, code_map: dict) -> dict:
                 except Exception:
                     # Parent directory doesn't exist, create it
                     print(f"Creating parent directory: {parent_dir}")
-                    result = sandbox.process.exec("mkdir", "-p", parent_dir).wait()
-                    if result.returncode != 0:
-                        print(f"Warning: mkdir returned {result.returncode}")
+                    result = _exit_code(sandbox.process.exec("mkdir", "-p", parent_dir).wait())
+                    if result != 0:
+                        print(f"Warning: mkdir returned {result}")
 
                 # Upload file to sandbox
                 sandbox.fs.upload_file(temp_file.name, sandbox_path)
+                updated.append(sandbox_path)
                 print(f"✅ Updated: {sandbox_path}")
                 
             except Exception as e:
+                failed.append(sandbox_path)
                 print(f"❌ Error updating {sandbox_path}: {e}")
             finally:
                 os.unlink(temp_file.name)
 
-    print(f"✅ Finished updating {len(code_map)} files")
-    
-    return {"sandbox_id": sandbox.sandbox_id()}
+    return updated, failed
 
 
 def _detect_language(file_path: str) -> str:
@@ -182,6 +420,75 @@ def _detect_language(file_path: str) -> str:
     return ext_map.get(ext, "plaintext")
 
 
+def _tree_node(name: str, path: str, is_dir: bool, size: int | None) -> dict:
+    node = {
+        "name": name,
+        "path": path,
+        "is_dir": is_dir,
+        "size": size if not is_dir else None,
+        "type": "folder" if is_dir else "file"
+    }
+    if is_dir:
+        node["children"] = []
+    else:
+        node["language"] = _detect_language(name)
+    return node
+
+
+def sort_tree(tree: list[dict]) -> None:
+    """Sort in place: directories first, then files alphabetically"""
+    tree.sort(key=lambda x: (not x["is_dir"], x["name"].lower()))
+    for node in tree:
+        if node["is_dir"]:
+            sort_tree(node["children"])
+
+
+def build_file_tree(sandbox, path: str = DEFAULT_CODE_PATH) -> list[dict]:
+    """
+    Build the file tree from a single find exec, falling back to walking
+    the directories with list_files if that fails.
+    """
+    try:
+        return _build_file_tree_find(sandbox, path)
+    except Exception as e:
+        print(f"find-based file tree failed, walking directories instead: {e}")
+        return _build_file_tree(sandbox, path)
+
+
+def _build_file_tree_find(sandbox, path: str) -> list[dict]:
+    prune = []
+    for name in TREE_SKIP_DIRS:
+        prune += ["-name", name, "-o"]
+
+    process = sandbox.process.exec(
+        "find", path, "-mindepth", "1",
+        "(", *prune[:-1], ")", "-prune",
+        "-o", "-printf", "%y\t%s\t%p\n",
+    )
+    exit_code = _exit_code(process.wait())
+    if exit_code != 0:
+        raise RuntimeError(f"find exited with {exit_code}")
+
+    root = path.rstrip("/")
+    tree: list[dict] = []
+    dirs = {root: tree}
+
+    # find lists a directory before its contents
+    for line in process.stdout.read().splitlines():
+        kind, size, full_path = line.split("\t", 2)
+        children = dirs.get(posixpath.dirname(full_path))
+        if children is None:
+            continue
+
+        node = _tree_node(posixpath.basename(full_path), full_path, kind == "d", int(size))
+        children.append(node)
+        if node["is_dir"]:
+            dirs[full_path] = node["children"]
+
+    sort_tree(tree)
+    return tree
+
+
 def _build_file_tree(sandbox, path: str) -> list[dict]:
     """Recursively build file tree structure"""
     try:
@@ -190,24 +497,16 @@ def _build_file_tree(sandbox, path: str) -> list[dict]:
         
         for file in files:
             # Skip node_modules and .git directories
-            if file.name in ["node_modules", ".git", "dist", "build"]:
+            if file.name in TREE_SKIP_DIRS:
                 continue
                 
             full_path = f"{path}/{file.name}" if not path.endswith('/') else f"{path}{file.name}"
             
-            node = {
-                "name": file.name,
-                "path": full_path,
-                "is_dir": file.is_dir,
-                "size": file.size if not file.is_dir else None,
-                "type": "folder" if file.is_dir else "file"
-            }
+            node = _tree_node(file.name, full_path, file.is_dir, file.size)
             
             if file.is_dir:
                 # Recursively get subdirectory contents
                 node["children"] = _build_file_tree(sandbox, full_path)
-            else:
-                node["language"] = _detect_language(file.name)
             
             tree.append(node)
         
@@ -223,10 +522,11 @@ def _build_file_tree(sandbox, path: str) -> list[dict]:
 def get_file_tree(sandbox_id: str) -> list[dict]:
     """Get the file tree structure from sandbox"""
     try:
-        sandbox = Sandbox().connect(sandbox_id)
-        sandbox.update_ttl(300)
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
         
-        tree = _build_file_tree(sandbox, DEFAULT_CODE_PATH)
+            tree = build_file_tree(sandbox, DEFAULT_CODE_PATH)
+
         return tree
         
     except Exception as e:
@@ -240,18 +540,18 @@ def get_file_content(sandbox_id: str, file_path: str) -> tuple[str, str]:
     Returns tuple of (content, language).
     """
     try:
-        sandbox = Sandbox().connect(sandbox_id)
-        sandbox.update_ttl(300)
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
         
-        # Download file to temp location
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            sandbox.fs.download_file(file_path, tmp.name)
+            # Download file to temp location
+            with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                sandbox.fs.download_file(file_path, tmp.name)
             
-            with open(tmp.name, 'r', encoding='utf-8') as f:
-                content = f.read()
+                with open(tmp.name, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
-            # Clean up temp file
-            os.unlink(tmp.name)
+                # Clean up temp file
+                os.unlink(tmp.name)
         
         language = _detect_language(file_path)
         return content, language
@@ -264,27 +564,27 @@ def get_file_content(sandbox_id: str, file_path: str) -> tuple[str, str]:
 def save_file(sandbox_id: str, file_path: str, content: str) -> bool:
     """Save edited file back to sandbox"""
     try:
-        sandbox = Sandbox().connect(sandbox_id)
-        sandbox.update_ttl(300)
+        with sandbox_handles.handle(sandbox_id) as sandbox:
+            keepalive.touch(sandbox_id)
         
-        # Write content to temp file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
-            tmp.write(content)
-            tmp.flush()
+            # Write content to temp file
+            with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+                tmp.write(content)
+                tmp.flush()
             
-            # Ensure parent directory exists
-            parent_dir = str(Path(file_path).parent)
-            try:
-                sandbox.fs.stat_file(parent_dir)
-            except Exception:
-                print(f"Creating parent directory: {parent_dir}")
-                sandbox.process.exec("mkdir", "-p", parent_dir).wait()
+                # Ensure parent directory exists
+                parent_dir = str(Path(file_path).parent)
+                try:
+                    sandbox.fs.stat_file(parent_dir)
+                except Exception:
+                    print(f"Creating parent directory: {parent_dir}")
+                    sandbox.process.exec("mkdir", "-p", parent_dir).wait()
             
-            # Upload file to sandbox
-            sandbox.fs.upload_file(tmp.name, file_path)
+                # Upload file to sandbox
+                sandbox.fs.upload_file(tmp.name, file_path)
             
-            # Clean up temp file
-            os.unlink(tmp.name)
+                # Clean up temp file
+                os.unlink(tmp.name)
         
         print(f"✅ Saved file: {file_path}")
         return True